@@ -1,13 +1,15 @@
 import random
+from collections import defaultdict
 from datetime import datetime
 import os
 
+import numpy as np
 import pandas as pd
 import plotly.graph_objects as go
 import streamlit as st
 
 from data_sources.news_articles import get_all_headlines
-from data_sources.stock_prices import get_stock_summary, get_trending_stocks
+from data_sources.stock_prices import get_trending_stocks
 
 from research_assistant.summarize_stock import (generate_stock_summary, suggest_stocks_to_watch,
                                                 compare_risks_between_stocks)
@@ -23,9 +25,9 @@ from utils.mood_tracker import save_macro_mood
 # from agent_reasoning.generate_hypotheses import generate_investment_hypothesis
 # from agent_reasoning.decision_maker import make_investment_decision
 
-from data_sources.earnings_reports import fetch_earnings_for_stock
-from data_sources.stock_prices import get_cached_stock_summary
-from portfolio.portfolio_allocator import fetch_current_prices, allocate_portfolio, allocate_portfolio_with_sector_preference, search_companies, get_popular_stocks, generate_weight_recommendations, get_market_insights, get_stock_sectors
+from data_sources.async_fetch import prefetch_tickers
+from data_sources.stock_prices import get_cached_stock_summaries as fetch_stock_summaries
+from portfolio.portfolio_allocator import fetch_current_prices, allocate_portfolio, allocate_portfolio_with_sector_preference, search_companies, get_popular_stocks, generate_weight_recommendations, get_market_insights, get_stock_sectors, get_stock_info
 
 # Multi-market support
 from utils.market_config import MARKET_CONFIGS, get_market_config, get_market_companies, format_ticker, format_currency, get_popular_stocks as get_market_popular_stocks, get_market_sectors, get_stock_name
@@ -102,9 +104,73 @@ def cached_get_popular_stocks():
 def get_popular_tickers_set():
     return {stock['ticker'].upper() for stock in get_popular_stocks()}
 
-@st.cache_data(ttl=3600)  # cache result for 1 hour
-def get_cached_stock_summary(ticker):
-    return get_stock_summary(ticker)
+@st.cache_data(ttl=3600)  # one parallel fetch for a whole set of tickers
+def get_cached_stock_summaries(tickers):
+    return fetch_stock_summaries(list(tickers))
+
+# Static budget guidance, built once per market instead of on every rerun
+MODERATE_UTILIZATION_TIPS = """
+**Suggestions to improve:**
+- Add 1-2 more stocks to your portfolio
+- Consider fractional shares for expensive stocks
+- Adjust stock weights to better match your budget
+"""
+
+POOR_UTILIZATION_TIPS = """
+**Major improvements needed:**
+- **Add more stocks** (aim for 5-10 stocks minimum)
+- **Increase budget** for better diversification
+- **Use fractional shares** for expensive stocks
+- **Consider lower-priced alternatives** for high-priced stocks
+"""
+
+@st.cache_resource
+def get_price_mix_guide(market_code):
+    """Markdown for the 'mix price ranges' advice of a market"""
+    currency_symbol = get_market_config(market_code).get('currency_symbol', '$')
+    popular_stocks = get_market_popular_stocks(market_code)[:6]
+    high_price_examples = ", ".join([f"{stock} - {get_stock_name(stock, market_code)}" for stock in popular_stocks[:2]])
+    mid_price_examples = ", ".join([f"{stock} - {get_stock_name(stock, market_code)}" for stock in popular_stocks[2:4]])
+    low_price_examples = ", ".join([f"{stock} - {get_stock_name(stock, market_code)}" for stock in popular_stocks[4:6]])
+    return f"""
+**🎯 Mix Price Ranges:**
+- **High-priced**: {high_price_examples} ({currency_symbol}100-300)
+- **Mid-priced**: {mid_price_examples} ({currency_symbol}50-150) 
+- **Low-priced**: {low_price_examples} ({currency_symbol}20-50)
+
+**📈 Smart Alternatives:**
+- **ETFs**: Broad market exposure for diversification
+- **Dividend stocks**: Often lower-priced, good for small budgets
+- **Fractional shares**: For expensive stocks you really want
+"""
+
+@st.cache_resource
+def get_stock_mix_guide(market_code):
+    """Markdown for the three 'recommended stock mix' columns of a market"""
+    currency_symbol = get_market_config(market_code).get('currency_symbol', '$')
+    popular_stocks = get_market_popular_stocks(market_code)[:6]
+    large_cap_examples = ", ".join([f"{stock} - {get_stock_name(stock, market_code)}" for stock in popular_stocks[:4]])
+    tech_examples = ", ".join([f"{stock} - {get_stock_name(stock, market_code)}" for stock in popular_stocks[4:7]])
+    etf_examples = "SPY, QQQ, VTI" if market_code == 'US' else "Market ETFs"
+    large_cap = f"""
+**🏢 Large Cap (Stable)**
+- {large_cap_examples}
+- Price: {currency_symbol}50-150
+- Good for 20-30% allocation
+"""
+    tech_growth = f"""
+**💻 Tech Growth**
+- {tech_examples}
+- Price: {currency_symbol}100-300
+- Good for 30-40% allocation
+"""
+    etfs = f"""
+**📈 ETFs (Diversified)**
+- {etf_examples}
+- Price: {currency_symbol}300-500
+- Good for 20-30% allocation
+"""
+    return large_cap, tech_growth, etfs
 
 # Process stock input function
 def process_stock_input(input_text):
@@ -274,10 +340,11 @@ with tab1:
 
     trending = trending_stocks[:n_trending]
     trending_with_change = []
+    trending_summaries = get_cached_stock_summaries(tuple(sym for sym, _ in trending))
 
     for sym, name in trending:
         try:
-            stock_info = get_cached_stock_summary(sym)
+            stock_info = trending_summaries[sym]
 
             # Handle errors gracefully
             if stock_info.get("error"):
@@ -288,9 +355,9 @@ with tab1:
                 trending_with_change.append((sym, name, 0.0))
                 continue
 
-            hist = stock_info.get("history")
-            if hist is not None and not hist.empty:
-                price_change = ((hist["Close"].iloc[-1] - hist["Close"].iloc[0]) / hist["Close"].iloc[0]) * 100
+            closes = stock_info.get("closes")
+            if closes is not None and closes.size:
+                price_change = ((closes[-1] - closes[0]) / closes[0]) * 100
                 trending_with_change.append((sym, name, round(price_change, 2)))
             else:
                 trending_with_change.append((sym, name, 0.0))
@@ -314,6 +381,10 @@ with tab1:
         selected_stocks = [random_stock]
 
     if selected_stocks:
+        # Summaries, headlines and earnings for every pick are fetched in one concurrent pass
+        with st.spinner("Fetching market data..."):
+            prefetched = prefetch_tickers([option.split(" - ")[0] for option in selected_stocks])
+
         for selected_option in selected_stocks:
             ticker = selected_option.split(" - ")[0]
             current_market = st.session_state.get('selected_market', 'US')
@@ -321,7 +392,7 @@ with tab1:
             st.markdown(f"### 📊 Summary for **{ticker} - {formatted_name}**")
 
             with st.spinner(f"Fetching data for {ticker}..."):
-                stock_info = get_cached_stock_summary(ticker)
+                stock_info = prefetched[ticker]["summary"]
 
                 # Handle API error messages early
                 if stock_info.get("error"):
@@ -332,20 +403,17 @@ with tab1:
                     continue
 
                 # Proceed with normal check
-                hist = stock_info.get("history")
-                if not stock_info.get("price") or hist is None or hist.empty:
+                closes = stock_info.get("closes")
+                if not stock_info.get("price") or closes is None or not closes.size:
                     st.error(f"❌ Could not fetch full data for {ticker}. Skipping.")
                     continue
 
-                if hist is None or hist.empty:
-                    st.warning(f"⚠️ No historical data for {ticker}. Displaying basic info only.")
-
-                price_change = ((hist["Close"].iloc[-1] - hist["Close"].iloc[0]) / hist["Close"].iloc[0]) * 100
+                price_change = ((closes[-1] - closes[0]) / closes[0]) * 100
 
                 # Price Chart
                 st.markdown(f"### 📉 5-Day Price Trend for {ticker} - {formatted_name}")
                 fig = go.Figure()
-                fig.add_trace(go.Scatter(x=hist.index, y=hist["Close"], mode='lines+markers', name=f"{ticker} - {formatted_name}"))
+                fig.add_trace(go.Scatter(x=stock_info["dates"], y=closes, mode='lines+markers', name=f"{ticker} - {formatted_name}"))
                 fig.update_layout(
                     title=f"{ticker} - {formatted_name} 5-Day Price Trend",
                     xaxis_title="Date", yaxis_title="Price ($)",
@@ -354,7 +422,7 @@ with tab1:
                 st.plotly_chart(fig, use_container_width=True)
 
                 # Headlines and Summary
-                headlines = get_all_headlines(ticker)
+                headlines = prefetched[ticker]["headlines"]
                 mood_text, summary_text = generate_stock_summary(
                     ticker, stock_info["name"], stock_info["price"], price_change, headlines
                 )
@@ -374,7 +442,7 @@ with tab1:
                 st.markdown(f"### 📋 Stock Summary")
                 st.markdown(f"**Price:** ${stock_info['price']} &nbsp;&nbsp;&nbsp; **5-Day Change:** {price_change:.2f}%")
 
-                earnings_data = fetch_earnings_for_stock(ticker)
+                earnings_data = prefetched[ticker]["earnings"]
                 eps_surprise_value = earnings_data.get("eps_surprise", None) if earnings_data else None
 
                 if isinstance(eps_surprise_value, (int, float)):
@@ -518,6 +586,11 @@ with tab1:
                                     comparison_data = []
                                     total_stocks = len(st.session_state.advanced_selected_stocks)
                                     
+                                    # Technical signals for every stock from one batched price download
+                                    all_technical_signals = technical_analyzer.generate_technical_signals_batch(
+                                        st.session_state.advanced_selected_stocks
+                                    )
+                                    
                                     # Create progress bar
                                     progress_bar = st.progress(0)
                                     status_text = st.empty()
@@ -529,7 +602,7 @@ with tab1:
                                         status_text.text(f"🔍 Analyzing {ticker}... ({i+1}/{total_stocks})")
                                         
                                         # Technical Analysis
-                                        technical_signals = technical_analyzer.generate_technical_signals(ticker)
+                                        technical_signals = all_technical_signals[ticker]
                                         
                                         # Fundamental Analysis
                                         fundamental_analysis = fundamental_analyzer.analyze_fundamentals(ticker)
@@ -944,21 +1017,22 @@ with tab3:
         cols = st.columns(len(tickers_only))
         summaries = []
         all_headlines = []
+        compare_summaries = get_cached_stock_summaries(tuple(tickers_only))
 
         for idx, ticker in enumerate(tickers_only):
             with cols[idx]:
                         current_market = st.session_state.get('selected_market', 'US')
                         st.subheader(f"📈 {ticker} - {get_stock_name(ticker, current_market)}")
-                        stock_info = get_cached_stock_summary(ticker)
+                        stock_info = compare_summaries[ticker]
                         headlines = get_all_headlines(ticker)
                         all_headlines.append((ticker, headlines))
 
-                        hist = stock_info.get("history")
-                        if hist is None or hist.empty:
+                        closes = stock_info.get("closes")
+                        if closes is None or not closes.size:
                             st.error(f"⚠️ No data for {ticker}")
                             continue
 
-                        price_change = ((hist["Close"].iloc[-1] - hist["Close"].iloc[0]) / hist["Close"].iloc[0]) * 100
+                        price_change = ((closes[-1] - closes[0]) / closes[0]) * 100
 
                         summary = generate_stock_summary(
                             ticker,
@@ -1118,14 +1192,11 @@ with tab4:
                                 
                                 # Get popular stocks once for validation
                                 popular_tickers = get_popular_tickers_set()
+                                market_popular_stocks = get_market_popular_stocks(current_market)
                                 
                                 for item in items:
                                     item_upper = item.upper().strip()
                                     
-                                    # Check if it's a valid ticker for current market
-                                    current_market = st.session_state.get('selected_market', 'US')
-                                    market_popular_stocks = get_market_popular_stocks(current_market)
-                                    
                                     # For US market: check if it's a valid US ticker
                                     if (current_market == 'US' and 
                                         len(item_upper) <= 5 and 
@@ -1213,12 +1284,12 @@ with tab4:
                                 if st.button("➕ Add These Stocks", key="add_from_text"):
                                     if ticker_input.strip():
                                         # Process the ticker input
-                                        input_tickers = [t.strip().upper() for t in ticker_input.split(",") if t.strip()]
+                                        input_tickers = [t for t in (t.strip().upper() for t in ticker_input.split(",")) if t]
                                         valid_tickers = []
                                         invalid_tickers = []
                                         
                                         # Validate against available options
-                                        available_tickers = {option.split(" - ")[0] for option in options}
+                                        available_tickers = seen_tickers
                                         
                                         for ticker in input_tickers:
                                             if ticker in available_tickers:
@@ -1266,18 +1337,9 @@ with tab4:
                                 })
                         
                         # Group by sector for better organization
-                        sectors = {}
+                        sectors = defaultdict(list)
                         for stock in popular_stocks:
-                            sector = stock['sector']
-                            if sector not in sectors:
-                                sectors[sector] = []
-                            sectors[sector].append(stock)
-                        
-                        # Track changes to avoid unnecessary reruns
-                        if 'popular_selections' not in st.session_state:
-                            st.session_state.popular_selections = set()
-                        
-                        selected_from_popular = []
+                            sectors[stock['sector']].append(stock)
                         
                         for sector, stocks in sectors.items():
                             st.markdown(f"**{sector}:**")
@@ -1286,32 +1348,19 @@ with tab4:
                                 col_idx = i % 3
                                 with cols[col_idx]:
                                     display_text = f"{stock['name']} ({stock['ticker']})"
-                                    checkbox_key = f"popular_{stock['ticker']}"
-                                    
-                                    # Check if this stock was previously selected
-                                    is_selected = stock['ticker'] in st.session_state.popular_selections
-                                    
-                                    if st.checkbox(display_text, value=is_selected, key=checkbox_key):
-                                        selected_from_popular.append(stock['ticker'])
-                                        st.session_state.popular_selections.add(stock['ticker'])
-                                    elif is_selected:
-                                        # Remove from selections if unchecked
-                                        st.session_state.popular_selections.discard(stock['ticker'])
+                                    # Checkbox state persists across reruns through its widget key
+                                    st.checkbox(display_text, key=f"popular_{stock['ticker']}")
                         
-                        # Only update if there are changes
-                        if selected_from_popular:
-                            # Add to session state
-                            if 'selected_stocks' not in st.session_state:
-                                st.session_state.selected_stocks = []
-                            
-                            added_count = 0
-                            for ticker in selected_from_popular:
-                                if ticker not in st.session_state.selected_stocks:
-                                    st.session_state.selected_stocks.append(ticker)
-                                    added_count += 1
-                            
-                            if added_count > 0:
-                                st.success(f"✅ Added {added_count} new stocks")
+                        selected_from_popular = [stock['ticker'] for stock in popular_stocks if st.session_state.get(f"popular_{stock['ticker']}")]
+                        
+                        # Batch newly checked stocks so several picks cost a single rerun
+                        st.session_state.pending_popular = [ticker for ticker in selected_from_popular if ticker not in st.session_state.selected_stocks]
+                        
+                        if st.session_state.pending_popular:
+                            pending_count = len(st.session_state.pending_popular)
+                            if st.button(f"➕ Apply {pending_count} selection{'s' if pending_count > 1 else ''}", key="apply_popular_selections"):
+                                st.session_state.selected_stocks.extend(st.session_state.pending_popular)
+                                st.session_state.pending_popular = []
                                 st.rerun()
                     
                     # Show final selected stocks summary
@@ -1328,38 +1377,42 @@ with tab4:
                         prices = fetch_current_prices(selected_symbols)
                     
                     if prices:
+                        # Display names are shared by every table below
+                        display_names = {ticker: f"{ticker} - {get_stock_name(ticker, current_market)}" for ticker in selected_symbols}
+                        
                         # Display current prices
                         st.markdown("### 💰 Current Prices")
                         price_data = []
                         for ticker in selected_symbols:
                             price = prices.get(ticker)
                             if price:
-                                formatted_name = get_stock_name(ticker, current_market)
                                 formatted_price = format_currency(price, current_market)
-                                price_data.append({"Ticker": f"{ticker} - {formatted_name}", "Current Price": formatted_price})
+                                price_data.append({"Ticker": display_names[ticker], "Current Price": formatted_price})
                         
                         if price_data:
-                            st.dataframe(pd.DataFrame(price_data), use_container_width=True, hide_index=True)
+                            st.table(pd.DataFrame(price_data).set_index("Ticker"))
                         
                         # Market Insights and Weight Recommendations
                         st.markdown("### 🧠 AI Weight Recommendations")
                         
                         # Get market insights
                         with st.spinner("Analyzing market conditions..."):
-                            insights = get_market_insights(selected_symbols)
-                            recommended_weights = generate_weight_recommendations(selected_symbols, tech_preference)
+                            # Metadata is fetched once (and cached per selection) and shared with the
+                            # insights, the weights and the allocation below
+                            stock_info = get_stock_info(selected_symbols)
+                            insights = get_market_insights(selected_symbols, stock_info)
+                            recommended_weights = generate_weight_recommendations(selected_symbols, tech_preference, stock_info)
                         
                         # Display insights
                         st.markdown("**📈 Market Analysis:**")
                         insight_data = []
                         for ticker in selected_symbols:
-                            formatted_name = get_stock_name(ticker, current_market)
                             insight_data.append({
-                                "Ticker": f"{ticker} - {formatted_name}",
+                                "Ticker": display_names[ticker],
                                 "Market Insights": insights.get(ticker, "📊 Data unavailable")
                             })
                         
-                        st.dataframe(pd.DataFrame(insight_data), use_container_width=True, hide_index=True)
+                        st.table(pd.DataFrame(insight_data).set_index("Ticker"))
                         
                         # Weight recommendation section
                         st.markdown("### ⚖️ Portfolio Weights")
@@ -1378,14 +1431,13 @@ with tab4:
                             weight_data = []
                             for ticker in selected_symbols:
                                 weight = recommended_weights.get(ticker, 0)
-                                formatted_name = get_stock_name(ticker, current_market)
                                 weight_data.append({
-                                    "Ticker": f"{ticker} - {formatted_name}",
+                                    "Ticker": display_names[ticker],
                                     "Recommended Weight": f"{weight:.1%}",
                                     "Reasoning": insights.get(ticker, "📊 Standard allocation")
                                 })
                             
-                            st.dataframe(pd.DataFrame(weight_data), use_container_width=True, hide_index=True)
+                            st.table(pd.DataFrame(weight_data).set_index("Ticker"))
                             
                             # Use recommended weights for allocation
                             custom_weights = recommended_weights
@@ -1431,14 +1483,19 @@ with tab4:
                                     tickers=selected_symbols,
                                     prices=prices,
                                     tech_preference=tech_preference,
-                                    custom_weights=custom_weights
+                                    custom_weights=custom_weights,
+                                    stock_info=stock_info
                                 )
                             
                             if allocation:
+                                # Materialize the allocation amounts once for all budget summaries below
+                                allocated_arr = np.fromiter((item['allocated'] for item in allocation), dtype=np.float64, count=len(allocation))
+                                fractional_arr = np.fromiter((item.get('fractional_allocated', item['allocated']) for item in allocation), dtype=np.float64, count=len(allocation))
+                                total_invested = float(allocated_arr.sum())
+                                unused_budget = budget - total_invested
+                                
                                 # Display allocation results
                                 allocation_data = []
-                                total_invested = 0
-                                unused_budget = budget
                                 
                                 for item in allocation:
                                     ticker = item['ticker']
@@ -1446,15 +1503,13 @@ with tab4:
                                     allocated = item['allocated']
                                     weight = item['weight']
                                     price = prices.get(ticker, 0)
-                                    total_invested += allocated
-                                    unused_budget -= allocated
                                     
                                     # Show fractional alternative if no shares bought
                                     if shares == 0 and item.get('fractional_shares', 0) > 0:
                                         fractional_shares = item['fractional_shares']
                                         fractional_allocated = item['fractional_allocated']
                                         allocation_data.append({
-                                            "Stock": f"{ticker} - {get_stock_name(ticker, current_market)}",
+                                            "Stock": display_names[ticker],
                                             "Price": format_currency(price, current_market),
                                             "Weight": f"{weight:.1%}",
                                             "Shares": f"{fractional_shares:.2f}",
@@ -1462,7 +1517,7 @@ with tab4:
                                         })
                                     else:
                                         allocation_data.append({
-                                            "Stock": f"{ticker} - {get_stock_name(ticker, current_market)}",
+                                            "Stock": display_names[ticker],
                                             "Price": format_currency(price, current_market),
                                             "Weight": f"{weight:.1%}",
                                             "Shares": f"{shares:.0f}",
@@ -1484,7 +1539,6 @@ with tab4:
                                 st.markdown("### 💰 Budget Analysis")
                                 col1, col2, col3 = st.columns(3)
                                 with col1:
-                                    current_market = st.session_state.get('selected_market', 'US')
                                     st.metric("Total Budget", format_currency(budget, current_market))
                                 with col2:
                                     st.metric("Allocated (Whole Shares)", format_currency(total_invested, current_market))
@@ -1507,21 +1561,10 @@ with tab4:
                                     st.info("Most of your budget is allocated. Consider adding more stocks or increasing budget for better diversification.")
                                 elif utilization_pct >= 70:
                                     st.warning("⚠️ **Moderate budget utilization** (70-85%)")
-                                    st.info("""
-                                    **Suggestions to improve:**
-                                    - Add 1-2 more stocks to your portfolio
-                                    - Consider fractional shares for expensive stocks
-                                    - Adjust stock weights to better match your budget
-                                    """)
+                                    st.info(MODERATE_UTILIZATION_TIPS)
                                 else:
                                     st.error("❌ **Poor budget utilization** (<70%)")
-                                    st.info("""
-                                    **Major improvements needed:**
-                                    - **Add more stocks** (aim for 5-10 stocks minimum)
-                                    - **Increase budget** for better diversification
-                                    - **Use fractional shares** for expensive stocks
-                                    - **Consider lower-priced alternatives** for high-priced stocks
-                                    """)
+                                    st.info(POOR_UTILIZATION_TIPS)
                                 
                                 # Show specific recommendations
                                 if unused_budget > 0:
@@ -1533,37 +1576,32 @@ with tab4:
                                         st.markdown("**Stocks with 0 shares (causing unused budget):**")
                                         
                                         # Create a clean table for zero-share stocks
-                                        zero_shares_data = []
-                                        for item in zero_shares:
-                                            fractional_shares = item.get('fractional_shares', 0)
-                                            if fractional_shares > 0:
-                                                zero_shares_data.append({
-                                                    "Stock": f"{item['ticker']} - {get_stock_name(item['ticker'], current_market)}",
-                                                    "Price": format_currency(item['price'], current_market),
-                                                    "Fractional Shares": f"{fractional_shares:.2f}",
-                                                    "Fractional Amount": format_currency(item['fractional_allocated'], current_market)
-                                                })
+                                        zero_shares_data = [{
+                                            "Stock": display_names[item['ticker']],
+                                            "Price": format_currency(item['price'], current_market),
+                                            "Fractional Shares": f"{item['fractional_shares']:.2f}",
+                                            "Fractional Amount": format_currency(item['fractional_allocated'], current_market)
+                                        } for item in zero_shares if item.get('fractional_shares', 0) > 0]
                                         
                                         if zero_shares_data:
-                                            st.dataframe(pd.DataFrame(zero_shares_data), use_container_width=True, hide_index=True)
+                                            st.table(pd.DataFrame(zero_shares_data).set_index("Stock"))
                                     
                                     # Calculate potential with fractional shares
-                                    total_fractional = sum(item.get('fractional_allocated', item['allocated']) for item in allocation)
+                                    total_fractional = float(fractional_arr.sum())
                                     if total_fractional > total_invested:
-                                        current_market = st.session_state.get('selected_market', 'US')
                                         st.info(f"💡 **With fractional shares**: Could utilize {format_currency(total_fractional, current_market)} ({(total_fractional/budget)*100:.1f}% of budget)")
                                     
                                     # Budget scaling recommendations
                                     if unused_budget > budget * 0.3:
                                         suggested_budget = budget * 1.5
-                                        current_market = st.session_state.get('selected_market', 'US')
                                         st.info(f"💡 **Consider increasing budget to {format_currency(suggested_budget, current_market)}** for better diversification")
                                     
                                     # Smart stock suggestions for better budget utilization
                                     st.markdown("### 🎯 SMART STOCK SELECTION GUIDE - MARKET SPECIFIC!")
                                     
                                     # Calculate average price of selected stocks
-                                    avg_price = sum(prices.get(ticker, 0) for ticker in selected_symbols) / len(selected_symbols)
+                                    price_arr = np.fromiter((prices.get(ticker) or 0.0 for ticker in selected_symbols), dtype=np.float64, count=len(selected_symbols))
+                                    avg_price = float(price_arr.mean())
                                     
                                     if avg_price > budget * 0.3:  # If average stock price is >30% of budget
                                         st.error("🚨 **STOCK PRICES TOO HIGH FOR BUDGET!**")
@@ -1572,74 +1610,27 @@ with tab4:
                                         col1, col2 = st.columns(2)
                                         
                                         with col1:
-                                            current_market = st.session_state.get('selected_market', 'US')
                                             st.metric("Current Average Price", format_currency(avg_price, current_market), "❌ Too High")
                                         
                                         with col2:
                                             st.metric("Recommended Average Price", format_currency(budget * 0.1, current_market), "✅ Ideal")
                                         
                                         st.markdown("**💡 Better stock selection strategies:**")
-                                        
-                                        # Create a simple list format
-                                        # Get market-specific examples
-                                        market_config = get_market_config(current_market)
-                                        currency_symbol = market_config.get('currency_symbol', '$')
-                                        popular_stocks = get_market_popular_stocks(current_market)[:6]
-                                        
-                                        # Create market-specific examples with formatted names
-                                        high_price_examples = ", ".join([f"{stock} - {get_stock_name(stock, current_market)}" for stock in popular_stocks[:2]])
-                                        mid_price_examples = ", ".join([f"{stock} - {get_stock_name(stock, current_market)}" for stock in popular_stocks[2:4]])
-                                        low_price_examples = ", ".join([f"{stock} - {get_stock_name(stock, current_market)}" for stock in popular_stocks[4:6]])
-                                        
-                                        st.markdown(f"""
-                                        **🎯 Mix Price Ranges:**
-                                        - **High-priced**: {high_price_examples} ({currency_symbol}100-300)
-                                        - **Mid-priced**: {mid_price_examples} ({currency_symbol}50-150) 
-                                        - **Low-priced**: {low_price_examples} ({currency_symbol}20-50)
-                                        
-                                        **📈 Smart Alternatives:**
-                                        - **ETFs**: Broad market exposure for diversification
-                                        - **Dividend stocks**: Often lower-priced, good for small budgets
-                                        - **Fractional shares**: For expensive stocks you really want
-                                        """)
+                                        st.markdown(get_price_mix_guide(current_market))
                                     
                                     # Suggest specific stock categories
                                     st.markdown("**💡 Recommended stock mix for your budget:**")
+                                    large_cap_guide, tech_growth_guide, etf_guide = get_stock_mix_guide(current_market)
                                     col1, col2, col3 = st.columns(3)
                                     
                                     with col1:
-                                        # Large Cap examples from current market with formatted names
-                                        large_cap_examples = ", ".join([f"{stock} - {get_stock_name(stock, current_market)}" for stock in popular_stocks[:4]])
-                                        st.markdown(f"""
-                                        **🏢 Large Cap (Stable)**
-                                        - {large_cap_examples}
-                                        - Price: {currency_symbol}50-150
-                                        - Good for 20-30% allocation
-                                        """)
+                                        st.markdown(large_cap_guide)
                                     
                                     with col2:
-                                        # Tech Growth examples from current market with formatted names
-                                        tech_stocks = popular_stocks[4:7] if len(popular_stocks) >= 7 else popular_stocks[4:]
-                                        tech_examples = ", ".join([f"{stock} - {get_stock_name(stock, current_market)}" for stock in tech_stocks])
-                                        st.markdown(f"""
-                                        **💻 Tech Growth**
-                                        - {tech_examples}
-                                        - Price: {currency_symbol}100-300
-                                        - Good for 30-40% allocation
-                                        """)
+                                        st.markdown(tech_growth_guide)
                                     
                                     with col3:
-                                        # Market-specific alternatives
-                                        if current_market == 'US':
-                                            etf_examples = "SPY, QQQ, VTI"
-                                        else:
-                                            etf_examples = "Market ETFs"
-                                        st.markdown(f"""
-                                        **📈 ETFs (Diversified)**
-                                        - {etf_examples}
-                                        - Price: {currency_symbol}300-500
-                                        - Good for 20-30% allocation
-                                        """)
+                                        st.markdown(etf_guide)
                                 
                                 # Export options - COMMENTED OUT
                                 # st.markdown("### 📤 Export Options")
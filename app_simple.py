@@ -1,11 +1,12 @@
+import bisect
 import streamlit as st
-import pandas as pd
 import numpy as np
-import yfinance as yf
 from datetime import datetime
 import requests
 import os
 from dotenv import load_dotenv
+from utils.indicator_kernels import rsi_last, sma_last
+from data_sources.stock_prices import get_ticker
 
 # Load environment variables
 load_dotenv()
@@ -22,93 +23,100 @@ st.markdown("Your LLM-powered assistant for investment research")
 # Add startup message
 st.success("🚀 **AI Stock Advisor is ready!** Enhanced with technical analysis, fundamental analysis, risk management, and backtesting capabilities.")
 
+@st.cache_data(ttl=300)  # reruns on widget changes reuse the fetched data
 def get_stock_data(ticker):
     """Get basic stock data"""
     try:
-        stock = yf.Ticker(ticker)
+        stock = get_ticker(ticker)
         info = stock.info
         hist = stock.history(period="5d")
         
         if hist.empty:
             return None, None, None
         
-        current_price = hist['Close'].iloc[-1]
-        price_change = ((current_price - hist['Close'].iloc[0]) / hist['Close'].iloc[0]) * 100
+        close = hist['Close'].to_numpy(dtype=float)
+        price_change = (close[-1] - close[0]) / close[0] * 100
         
         return info, hist, price_change
     except Exception as e:
         st.error(f"Error fetching data for {ticker}: {e}")
         return None, None, None
 
+def _compute_indicators(close):
+    """Latest price indicators from one closing-price array"""
+    last = close[-1]
+    ma5 = sma_last(close, 5)
+    return {
+        "last": last,
+        "ma5": ma5,
+        "ma20": sma_last(close, 20) if len(close) >= 20 else ma5,
+        "rsi": rsi_last(close, 14),
+    }
+
+# Score contribution of each signal tag in generate_simple_recommendation
+SIGNAL_TAG_WEIGHTS = {
+    "bullish": 1, "buy": 1, "good": 1,
+    "bearish": -1, "sell": -1, "poor": -1,
+    "neutral": 0,
+}
+
 def simple_technical_analysis(hist):
-    """Simple technical analysis without complex dependencies"""
+    """Simple technical analysis returning (tag, description) signals"""
     if hist is None or hist.empty:
-        return "No data available"
+        return [("neutral", "No data available")]
     
-    # Simple moving averages
-    ma_5 = hist['Close'].rolling(window=5).mean().iloc[-1]
-    ma_20 = hist['Close'].rolling(window=20).mean().iloc[-1] if len(hist) >= 20 else ma_5
-    
-    # Simple RSI calculation
-    delta = hist['Close'].diff()
-    gain = (delta.where(delta > 0, 0)).rolling(window=14).mean()
-    loss = (-delta.where(delta < 0, 0)).rolling(window=14).mean()
-    rs = gain / loss
-    rsi = 100 - (100 / (1 + rs))
-    current_rsi = rsi.iloc[-1] if not pd.isna(rsi.iloc[-1]) else 50
+    indicators = _compute_indicators(hist['Close'].to_numpy(dtype=float))
+    current_rsi = indicators["rsi"]
     
     # Generate signals
     signals = []
     if current_rsi < 30:
-        signals.append("RSI: Oversold (Buy signal)")
+        signals.append(("buy", "RSI: Oversold (Buy signal)"))
     elif current_rsi > 70:
-        signals.append("RSI: Overbought (Sell signal)")
+        signals.append(("sell", "RSI: Overbought (Sell signal)"))
     else:
-        signals.append(f"RSI: {current_rsi:.1f} (Neutral)")
+        signals.append(("neutral", f"RSI: {current_rsi:.1f} (Neutral)"))
     
-    if hist['Close'].iloc[-1] > ma_5:
-        signals.append("Price above 5-day MA (Bullish)")
+    if indicators["last"] > indicators["ma5"]:
+        signals.append(("bullish", "Price above 5-day MA (Bullish)"))
     else:
-        signals.append("Price below 5-day MA (Bearish)")
+        signals.append(("bearish", "Price below 5-day MA (Bearish)"))
     
     return signals
 
+# Ascending thresholds and the (tag, label) for each band between them.
+# P/E and Debt/Equity bands include their lower bound (bisect_right), ROE bands their upper bound (bisect_left).
+_PE_THRESHOLDS = (15, 25)
+_PE_CLASSES = (("good", "Undervalued"), ("neutral", "Fair value"), ("poor", "Overvalued"))
+_ROE_THRESHOLDS = (0.10, 0.15)
+_ROE_CLASSES = (("poor", "Poor"), ("good", "Good"), ("good", "Excellent"))
+_DEBT_EQUITY_THRESHOLDS = (0.3, 0.5)
+_DEBT_EQUITY_CLASSES = (("neutral", "Low debt"), ("neutral", "Moderate debt"), ("poor", "High debt"))
+
 def simple_fundamental_analysis(info):
-    """Simple fundamental analysis"""
+    """Simple fundamental analysis returning (tag, description) metrics"""
     if not info:
-        return "No fundamental data available"
+        return [("neutral", "No fundamental data available")]
     
     metrics = []
     
     # P/E Ratio
     pe_ratio = info.get('trailingPE', 0)
     if pe_ratio > 0:
-        if pe_ratio < 15:
-            metrics.append(f"P/E: {pe_ratio:.1f} (Undervalued)")
-        elif pe_ratio < 25:
-            metrics.append(f"P/E: {pe_ratio:.1f} (Fair value)")
-        else:
-            metrics.append(f"P/E: {pe_ratio:.1f} (Overvalued)")
+        tag, label = _PE_CLASSES[bisect.bisect_right(_PE_THRESHOLDS, pe_ratio)]
+        metrics.append((tag, f"P/E: {pe_ratio:.1f} ({label})"))
     
     # ROE
     roe = info.get('returnOnEquity', 0)
     if roe > 0:
-        if roe > 0.15:
-            metrics.append(f"ROE: {roe:.1%} (Excellent)")
-        elif roe > 0.10:
-            metrics.append(f"ROE: {roe:.1%} (Good)")
-        else:
-            metrics.append(f"ROE: {roe:.1%} (Poor)")
+        tag, label = _ROE_CLASSES[bisect.bisect_left(_ROE_THRESHOLDS, roe)]
+        metrics.append((tag, f"ROE: {roe:.1%} ({label})"))
     
     # Debt to Equity
     debt_equity = info.get('debtToEquity', 0)
     if debt_equity > 0:
-        if debt_equity < 0.3:
-            metrics.append(f"Debt/Equity: {debt_equity:.2f} (Low debt)")
-        elif debt_equity < 0.5:
-            metrics.append(f"Debt/Equity: {debt_equity:.2f} (Moderate debt)")
-        else:
-            metrics.append(f"Debt/Equity: {debt_equity:.2f} (High debt)")
+        tag, label = _DEBT_EQUITY_CLASSES[bisect.bisect_right(_DEBT_EQUITY_THRESHOLDS, debt_equity)]
+        metrics.append((tag, f"Debt/Equity: {debt_equity:.2f} ({label})"))
     
     return metrics
 
@@ -131,17 +139,9 @@ def generate_simple_recommendation(price_change, technical_signals, fundamental_
         score -= 1
         reasoning.append("Negative price momentum")
     
-    # Technical signals
-    bullish_signals = sum(1 for signal in technical_signals if "Bullish" in signal or "Buy" in signal)
-    bearish_signals = sum(1 for signal in technical_signals if "Bearish" in signal or "Sell" in signal)
-    
-    score += bullish_signals - bearish_signals
-    
-    # Fundamental metrics
-    good_fundamentals = sum(1 for metric in fundamental_metrics if "Excellent" in metric or "Good" in metric or "Undervalued" in metric)
-    poor_fundamentals = sum(1 for metric in fundamental_metrics if "Poor" in metric or "Overvalued" in metric or "High debt" in metric)
-    
-    score += good_fundamentals - poor_fundamentals
+    # Technical signals and fundamental metrics, scored by their tags
+    score += sum(SIGNAL_TAG_WEIGHTS[tag] for tag, _ in technical_signals)
+    score += sum(SIGNAL_TAG_WEIGHTS[tag] for tag, _ in fundamental_metrics)
     
     # Generate recommendation
     if score >= 3:
@@ -187,13 +187,13 @@ def main():
                 # Technical Analysis
                 st.subheader("📈 Technical Analysis")
                 technical_signals = simple_technical_analysis(hist)
-                for signal in technical_signals:
+                for _, signal in technical_signals:
                     st.write(f"• {signal}")
                 
                 # Fundamental Analysis
                 st.subheader("💼 Fundamental Analysis")
                 fundamental_metrics = simple_fundamental_analysis(info)
-                for metric in fundamental_metrics:
+                for _, metric in fundamental_metrics:
                     st.write(f"• {metric}")
                 
                 # AI Recommendation
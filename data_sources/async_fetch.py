@@ -0,0 +1,39 @@
+# data_sources/async_fetch.py
+
+import asyncio
+
+from data_sources.earnings_reports import fetch_earnings_for_stock
+from data_sources.news_articles import get_all_headlines
+from data_sources.stock_prices import get_cached_stock_summary
+
+MAX_CONCURRENT_REQUESTS = 10
+
+async def gather_ticker(ticker, semaphore):
+    """
+    Fetch a ticker's price summary, headlines and latest earnings concurrently.
+    """
+    async def run(func):
+        async with semaphore:
+            return await asyncio.to_thread(func, ticker)
+
+    summary, headlines, earnings = await asyncio.gather(
+        run(get_cached_stock_summary),
+        run(get_all_headlines),
+        run(fetch_earnings_for_stock),
+    )
+    return {"summary": summary, "headlines": headlines, "earnings": earnings}
+
+async def _gather_tickers(tickers):
+    semaphore = asyncio.Semaphore(MAX_CONCURRENT_REQUESTS)
+    results = await asyncio.gather(*(gather_ticker(t, semaphore) for t in tickers))
+    return dict(zip(tickers, results))
+
+def prefetch_tickers(tickers):
+    """
+    Prefetch summary, headlines and earnings for every ticker in one concurrent pass.
+    Returns {ticker: {"summary": ..., "headlines": [...], "earnings": {...} or None}}.
+    """
+    tickers = list(dict.fromkeys(tickers))
+    if not tickers:
+        return {}
+    return asyncio.run(_gather_tickers(tickers))
@@ -0,0 +1,154 @@
+# data_sources/cache.py
+
+import os
+import time
+import pickle
+import tempfile
+import hashlib
+import contextlib
+import functools
+import threading
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util import Retry
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+    # Falls back to requests' stdlib json decoding
+try:
+    import diskcache
+    DISKCACHE_AVAILABLE = True
+except ImportError:
+    DISKCACHE_AVAILABLE = False
+    # Falls back to one pickle file per cached call
+
+CACHE_DIR = os.getenv("STOCK_ADVISOR_CACHE_DIR", ".cache")
+
+_disk_cache = diskcache.Cache(CACHE_DIR) if DISKCACHE_AVAILABLE else None
+
+# One session per process, shared across reruns, sessions and worker threads
+_session = None
+_session_lock = threading.Lock()
+
+def get_session():
+    """
+    Shared requests.Session that retries transient failures with backoff.
+    Connections are kept alive and pooled per host, so repeat calls skip the TCP/TLS handshake.
+    """
+    global _session
+    if _session is None:
+        with _session_lock:
+            if _session is None:
+                retry = Retry(total=3, backoff_factor=0.3, status_forcelist=(429, 500, 502, 503, 504))
+                adapter = HTTPAdapter(max_retries=retry, pool_connections=10, pool_maxsize=20)
+                session = requests.Session()
+                session.mount("http://", adapter)
+                session.mount("https://", adapter)
+                _session = session
+    return _session
+
+def decode_json(response):
+    """
+    Decode a JSON response body, using orjson when it is installed.
+    """
+    if ORJSON_AVAILABLE:
+        return orjson.loads(response.content)
+    return response.json()
+
+def cached_get(url, cache_name, expire=24 * 3600, **kwargs):
+    """
+    Conditional GET: revalidate a previously stored JSON body with ETag / Last-Modified,
+    reusing it on 304 Not Modified. Returns the decoded JSON.
+    """
+    key = hashlib.sha1(cache_name.encode("utf-8")).hexdigest()
+    cached = _read(key)
+
+    headers = dict(kwargs.pop("headers", None) or {})
+    if cached:
+        if cached.get("etag"):
+            headers["If-None-Match"] = cached["etag"]
+        if cached.get("last_modified"):
+            headers["If-Modified-Since"] = cached["last_modified"]
+
+    response = get_session().get(url, headers=headers, **kwargs)
+    if cached and response.status_code == 304:
+        return cached["body"]
+
+    response.raise_for_status()
+    body = decode_json(response)
+    etag = response.headers.get("ETag")
+    last_modified = response.headers.get("Last-Modified")
+    if etag or last_modified:
+        _write(key, {"body": body, "etag": etag, "last_modified": last_modified}, expire)
+    return body
+
+def _cache_key(func, args, kwargs):
+    raw = repr((func.__module__, func.__qualname__, args, sorted(kwargs.items())))
+    return hashlib.sha1(raw.encode("utf-8")).hexdigest()
+
+def _read(key):
+    if _disk_cache is not None:
+        return _disk_cache.get(key)
+
+    path = os.path.join(CACHE_DIR, f"{key}.pkl")
+    try:
+        with open(path, "rb") as f:
+            expires_at, value = pickle.load(f)
+    except (OSError, pickle.UnpicklingError, EOFError, ValueError):
+        return None
+    return value if expires_at > time.time() else None
+
+def _write(key, value, expire):
+    if _disk_cache is not None:
+        _disk_cache.set(key, value, expire=expire)
+        return
+
+    try:
+        os.makedirs(CACHE_DIR, exist_ok=True)
+        # Write to a private temp file and rename it into place, so concurrent readers
+        # never see a half-written pickle
+        fd, tmp_path = tempfile.mkstemp(dir=CACHE_DIR, suffix=".tmp")
+    except OSError:
+        return  # caching is best-effort
+    try:
+        with os.fdopen(fd, "wb") as f:
+            pickle.dump((time.time() + expire, value), f)
+        os.replace(tmp_path, os.path.join(CACHE_DIR, f"{key}.pkl"))
+    except OSError:
+        pass
+    finally:
+        with contextlib.suppress(OSError):
+            os.remove(tmp_path)  # only still there if the dump or rename failed
+
+def disk_memoize(expire, cache_if=lambda result: result is not None):
+    """
+    Persist a function's results on disk for `expire` seconds, keyed on its arguments,
+    so repeat lookups survive app restarts. Results failing `cache_if` are not stored.
+    """
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            key = _cache_key(func, args, kwargs)
+            cached = _read(key)
+            if cached is not None:
+                return cached
+
+            result = func(*args, **kwargs)
+            if cache_if(result):
+                _write(key, result, expire)
+            return result
+
+        # Manual access to the same entries, for callers that compute the value another way (e.g. async)
+        def lookup(*args, **kwargs):
+            return _read(_cache_key(func, args, kwargs))
+
+        def store(result, *args, **kwargs):
+            if cache_if(result):
+                _write(_cache_key(func, args, kwargs), result, expire)
+
+        wrapper.lookup = lookup
+        wrapper.store = store
+        return wrapper
+    return decorator
@@ -1,10 +1,11 @@
-import requests
 import os
 from dotenv import load_dotenv
+from data_sources.cache import decode_json, disk_memoize, get_session
 
 load_dotenv()
 FINNHUB_API_KEY = os.getenv("FINNHUB_API_KEY")
 
+@disk_memoize(expire=24 * 3600)
 def fetch_earnings_for_stock(ticker):
     """
     Fetch the most recent earnings report for a given stock using the Finnhub API.
@@ -12,9 +13,9 @@ def fetch_earnings_for_stock(ticker):
     url = f"https://finnhub.io/api/v1/stock/earnings?symbol={ticker}&token={FINNHUB_API_KEY}"
 
     try:
-        response = requests.get(url)
+        response = get_session().get(url, timeout=10)
         response.raise_for_status()
-        data = response.json()
+        data = decode_json(response)
 
         if not data:
             return None
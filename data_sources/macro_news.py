@@ -1,21 +1,21 @@
 # data_sources/macro_news.py
 
 import os
-import requests
 from dotenv import load_dotenv
+from data_sources.cache import cached_get, disk_memoize
 
 load_dotenv()
 FINNHUB_API_KEY = os.getenv("FINNHUB_API_KEY")
 
+@disk_memoize(expire=15 * 60, cache_if=bool)
 def get_macro_headlines(limit=5):
     """
     Fetch top recent macroeconomic/general news from Finnhub.
     """
     url = f"https://finnhub.io/api/v1/news?category=general&token={FINNHUB_API_KEY}"
     try:
-        response = requests.get(url)
-        response.raise_for_status()
-        news = response.json()
+        # Revalidates the last download instead of refetching it when Finnhub reports no change
+        news = cached_get(url, "finnhub:news:general", timeout=10)
 
         # Filter top relevant headlines
         top_news = news[:limit]
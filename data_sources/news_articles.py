@@ -1,13 +1,25 @@
-import requests
 import os
+from concurrent.futures import ThreadPoolExecutor
 from bs4 import BeautifulSoup
 import streamlit as st
+from data_sources.cache import decode_json, disk_memoize, get_session
+try:
+    from lxml import html as lxml_html
+    LXML_AVAILABLE = True
+except ImportError:
+    LXML_AVAILABLE = False
+    # Falls back to BeautifulSoup's html.parser
 
-@st.cache_data(ttl=1800)  # Cache for 30 minutes
-def get_recent_headlines(ticker):
-    """
-    Uses NewsAPI to fetch recent headlines about a stock ticker.
-    """
+if LXML_AVAILABLE:
+    _HEADLINE_XPATH = lxml_html.etree.XPath(
+        "//div[contains(concat(' ', normalize-space(@class), ' '), ' BNeawe ')"
+        " and contains(concat(' ', normalize-space(@class), ' '), ' vvjwJb ')"
+        " and contains(concat(' ', normalize-space(@class), ' '), ' AP7Wnd ')]"
+    )
+
+# Failed (None) or empty fetches aren't written to disk, so they're retried after a restart
+@disk_memoize(expire=1800, cache_if=bool)
+def _fetch_newsapi_headlines(ticker):
     api_key = os.getenv("NEWS_API_KEY")
     company_name = ticker.upper()
 
@@ -20,33 +32,46 @@ def get_recent_headlines(ticker):
         "apiKey": api_key
     }
 
-    response = requests.get(url, params=params)
+    response = get_session().get(url, params=params, timeout=10)
 
     if response.status_code != 200:
         print(f"❌ Error fetching news: {response.status_code}")
-        return [f"No news found for {ticker}"]
+        return None
 
-    articles = response.json().get("articles", [])
-    headlines = [article["title"] for article in articles]
+    articles = decode_json(response).get("articles", [])
+    return [article["title"] for article in articles]
 
-    return headlines if headlines else [f"No recent news found for {ticker}"]
-
-@st.cache_data(ttl=1800)  # Cache for 30 minutes
-def get_google_news_headlines(ticker):
-    """
-    Scrapes Google News for recent headlines.
-    """
+@disk_memoize(expire=1800, cache_if=bool)
+def _fetch_google_news_headlines(ticker):
     search_url = f"https://www.google.com/search?q={ticker}+stock+news&tbm=nws"
     headers = {
         "User-Agent": "Mozilla/5.0"
     }
 
-    response = requests.get(search_url, headers=headers)
+    response = get_session().get(search_url, headers=headers, timeout=10)
+    if LXML_AVAILABLE and response.content:
+        tree = lxml_html.fromstring(response.content)
+        return [item.text_content() for item in _HEADLINE_XPATH(tree)[:5]]
     soup = BeautifulSoup(response.text, "html.parser")
     results = soup.find_all("div", class_="BNeawe vvjwJb AP7Wnd")
+    return [item.get_text() for item in results[:5]]
 
-    headlines = [item.get_text() for item in results[:5]]
-    return headlines if headlines else [f"No Google headlines found for {ticker}"]
+@st.cache_data(ttl=1800)  # Cache for 30 minutes
+def get_recent_headlines(ticker):
+    """
+    Uses NewsAPI to fetch recent headlines about a stock ticker.
+    """
+    headlines = _fetch_newsapi_headlines(ticker)
+    if headlines is None:
+        return [f"No news found for {ticker}"]
+    return headlines if headlines else [f"No recent news found for {ticker}"]
+
+@st.cache_data(ttl=1800)  # Cache for 30 minutes
+def get_google_news_headlines(ticker):
+    """
+    Scrapes Google News for recent headlines.
+    """
+    return _fetch_google_news_headlines(ticker) or [f"No Google headlines found for {ticker}"]
 
 @st.cache_data(ttl=1800)  # Cache for 30 minutes
 def get_all_headlines(ticker):
@@ -57,8 +82,12 @@ def get_all_headlines(ticker):
     # The print statements will only show once per unique ticker due to caching
     print(f"📰 Fetching news headlines for {ticker}...")
     
-    newsapi_headlines = get_recent_headlines(ticker)
-    google_headlines = get_google_news_headlines(ticker)
+    # The two sources are independent, so fetch them side by side
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        newsapi_future = executor.submit(get_recent_headlines, ticker)
+        google_future = executor.submit(get_google_news_headlines, ticker)
+        newsapi_headlines = newsapi_future.result()
+        google_headlines = google_future.result()
 
     combined = list(dict.fromkeys(newsapi_headlines + google_headlines))  # removes duplicates
     return combined[:7]  # limit to top 7 headlines total
\ No newline at end of file
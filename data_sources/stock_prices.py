@@ -1,28 +1,77 @@
-import requests
 from bs4 import BeautifulSoup
 import pandas as pd
-from datetime import datetime
-import yfinance as yf
+import numpy as np
 import time
+from functools import lru_cache
+from concurrent.futures import ThreadPoolExecutor, as_completed
+import threading
+from collections import OrderedDict
+import yfinance as yf
+from data_sources.cache import decode_json, disk_memoize, get_session
+try:
+    from lxml import html as lxml_html
+    LXML_AVAILABLE = True
+except ImportError:
+    LXML_AVAILABLE = False
+    # Falls back to BeautifulSoup's html.parser
+
+if LXML_AVAILABLE:
+    # Data rows of the first table; the header row lives in <thead> or has no <td>
+    _TRENDING_ROWS_XPATH = lxml_html.etree.XPath("(//table)[1]//tr[td]")
+
+SUMMARY_TTL_SECONDS = 300  # in-memory summaries are reused within 5-minute windows
 
-CACHE = {}
+# Caps concurrent Yahoo requests so parallel fetches stay under the rate limit
+_REQUEST_SLOTS = threading.BoundedSemaphore(4)
+
+# yf.Ticker instances keep their fetched .info, so reuse one per symbol and replace it once
+# that data is older than TICKER_TTL_SECONDS; least recently used symbols are evicted
+# beyond TICKER_CACHE_SIZE so the map doesn't grow with every symbol ever looked up
+TICKER_TTL_SECONDS = 300
+TICKER_CACHE_SIZE = 256
+_TICKERS = OrderedDict()
+_TICKERS_LOCK = threading.Lock()
+
+SPARK_URL = "https://query1.finance.yahoo.com/v8/finance/spark"
+SPARK_BATCH_SIZE = 20  # spark accepts at most 20 symbols per request
+
+def get_ticker(symbol, max_age=TICKER_TTL_SECONDS):
+    """
+    Return a shared yf.Ticker for the symbol, creating a fresh one on first use
+    or when the cached instance is older than max_age seconds.
+    """
+    now = time.monotonic()
+    # Locked so concurrent workers share one instance instead of each fetching its own .info
+    with _TICKERS_LOCK:
+        entry = _TICKERS.get(symbol)
+        if entry is None or now - entry[0] > max_age:
+            entry = _TICKERS[symbol] = (now, yf.Ticker(symbol))
+        _TICKERS.move_to_end(symbol)
+        if len(_TICKERS) > TICKER_CACHE_SIZE:
+            _TICKERS.popitem(last=False)
+    return entry[1]
 
+@disk_memoize(expire=300, cache_if=lambda summary: "error" not in summary)
 def get_stock_summary(ticker_symbol):
     try:
-        ticker = yf.Ticker(ticker_symbol)
+        ticker = get_ticker(ticker_symbol)
         hist = ticker.history(period="5d")
         info = ticker.info
 
+        # Callers only need the closing prices, so drop the rest of the OHLCV frame here
+        closes = hist["Close"].to_numpy(dtype=np.float64)
         return {
-            "price": info.get("regularMarketPrice"),
+            "price": info.get("regularMarketPrice") or (float(closes[-1]) if closes.size else None),
             "name": info.get("shortName", ticker_symbol),
-            "history": hist
+            "closes": closes,
+            "dates": hist.index.to_numpy()
         }
     except Exception as e:
         return {
             "price": None,
             "name": ticker_symbol,
-            "history": None,
+            "closes": None,
+            "dates": None,
             "error": str(e)
         }
 
@@ -33,15 +82,25 @@ def get_trending_stocks(limit=10):
     url = "https://finance.yahoo.com/trending-tickers"
     headers = {"User-Agent": "Mozilla/5.0"}
 
-    res = requests.get(url, headers=headers)
-    soup = BeautifulSoup(res.text, "html.parser")
-    table = soup.find("table")
+    res = get_session().get(url, headers=headers, timeout=10)
 
     tickers = []
+    if LXML_AVAILABLE and res.content:
+        tree = lxml_html.fromstring(res.content)
+        for row in _TRENDING_ROWS_XPATH(tree)[:limit]:
+            cols = row.xpath("./td")
+            if len(cols) >= 2:
+                symbol = cols[0].text_content().strip()
+                name = cols[1].text_content().strip()
+                tickers.append((symbol, name))
+        return tickers
+
+    soup = BeautifulSoup(res.text, "html.parser")
+    table = soup.find("table")
     if table:
-        rows = table.find_all("tr")[1:]  # skip header row
-        for row in rows[:limit]:
-            cols = row.find_all("td")
+        rows = table.find_all("tr", limit=limit + 1)[1:]  # skip header row
+        for row in rows:
+            cols = row.find_all("td", limit=2)
             if len(cols) >= 2:
                 symbol = cols[0].text.strip()
                 name = cols[1].text.strip()
@@ -49,14 +108,90 @@ def get_trending_stocks(limit=10):
 
     return tickers
 
+def _iter_spark_results(payload):
+    """Yield (symbol, {"timestamp": [...], "close": [...]}) from either spark response layout."""
+    if "spark" in payload:
+        for item in payload["spark"].get("result") or []:
+            response = (item.get("response") or [{}])[0]
+            quote = (response.get("indicators", {}).get("quote") or [{}])[0]
+            yield item.get("symbol"), {"timestamp": response.get("timestamp"), "close": quote.get("close")}
+    else:
+        for symbol, data in payload.items():
+            if isinstance(data, dict):
+                yield symbol, data
+
+def get_bulk_prices(tickers, period="5d"):
+    """
+    Fetch recent daily closes for many tickers with one spark request per 20 symbols.
+    Returns {ticker: {"price": last_close, "history": pd.Series of closes}};
+    tickers Yahoo could not resolve are left out.
+    """
+    headers = {"User-Agent": "Mozilla/5.0"}
+    results = {}
+
+    for start in range(0, len(tickers), SPARK_BATCH_SIZE):
+        batch = tickers[start:start + SPARK_BATCH_SIZE]
+        params = {"symbols": ",".join(batch), "range": period, "interval": "1d"}
+        try:
+            res = get_session().get(SPARK_URL, params=params, headers=headers, timeout=10)
+            res.raise_for_status()
+            payload = decode_json(res)
+        except Exception:
+            continue
+
+        for symbol, data in _iter_spark_results(payload):
+            points = [(ts, close) for ts, close in zip(data.get("timestamp") or [], data.get("close") or [])
+                      if close is not None]
+            if symbol and points:
+                timestamps, closes = zip(*points)
+                history = pd.Series(closes, index=pd.to_datetime(timestamps, unit="s"), name="Close")
+                results[symbol] = {"price": closes[-1], "history": history}
+
+    return results
+
+def bulk_history(tickers, period=None, start=None, end=None):
+    """
+    Download several tickers' daily histories in one batched, threaded yf.download call,
+    either for a period (e.g. "1y") or between start and end dates.
+    Returns {ticker: OHLCV DataFrame}; tickers without data map to an empty DataFrame.
+    """
+    if start or end:
+        data = yf.download(tickers, start=start, end=end, group_by='ticker', threads=True, progress=False)
+    else:
+        data = yf.download(tickers, period=period, group_by='ticker', threads=True, progress=False)
+
+    available = set() if data is None or data.empty else set(data.columns.get_level_values(0))
+    histories = {}
+    for ticker in tickers:
+        if ticker in available:
+            # Dates are aligned across tickers, so drop the ones this ticker didn't trade
+            histories[ticker] = data[ticker].dropna(subset=['Close'])
+        else:
+            histories[ticker] = pd.DataFrame()
+    return histories
+
+@lru_cache(maxsize=128)
+def _fetch(ticker, time_bucket):
+    # time_bucket only keys the cache; a new bucket forces a fresh fetch
+    with _REQUEST_SLOTS:  # throttle to avoid API limit
+        return get_stock_summary(ticker)
+
+def _current_bucket():
+    return int(time.monotonic() // SUMMARY_TTL_SECONDS)
+
 def get_cached_stock_summary(ticker):
-    if ticker in CACHE and not is_stale(CACHE[ticker]):
-        return CACHE[ticker]
+    return _fetch(ticker, _current_bucket())
 
-    time.sleep(7.5)  # throttle to avoid API limit
-    stock_info = get_stock_summary(ticker)
-    CACHE[ticker] = stock_info
-    return stock_info
+def get_cached_stock_summaries(tickers, max_workers=8):
+    """
+    Fetch summaries for several tickers at once, returning {ticker: summary}.
+    Cached entries come straight back; the rest are fetched in parallel.
+    """
+    unique = list(dict.fromkeys(tickers))
+    if not unique:
+        return {}
 
-def is_stale(entry, ttl_seconds=3600):
-    return (datetime.utcnow() - entry["timestamp"]).total_seconds() > ttl_seconds
\ No newline at end of file
+    bucket = _current_bucket()
+    with ThreadPoolExecutor(max_workers=min(max_workers, len(unique))) as executor:
+        futures = {executor.submit(_fetch, t, bucket): t for t in unique}
+        return {futures[future]: future.result() for future in as_completed(futures)}
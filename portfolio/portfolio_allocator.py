@@ -1,22 +1,121 @@
-import yfinance as yf
-from typing import List, Dict, Optional
+import numpy as np
+from typing import List, Dict, Optional, Tuple
 import time
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from collections import defaultdict
+import heapq
+import logging
+import re
+from data_sources.stock_prices import get_bulk_prices, get_ticker
+
+
+logger = logging.getLogger(__name__)
+
+INFO_TTL_SECONDS = 60
+RECOMMENDATION_TTL_SECONDS = 60
+SEARCH_GRAM_SIZE = 3  # longest substring length indexed for search_companies
+
+# Popular stocks for quick reference, built once at import
+_POPULAR_STOCKS = (
+    {"ticker": "AAPL", "name": "Apple Inc.", "sector": "Technology"},
+    {"ticker": "MSFT", "name": "Microsoft Corporation", "sector": "Technology"},
+    {"ticker": "GOOGL", "name": "Alphabet Inc.", "sector": "Technology"},
+    {"ticker": "AMZN", "name": "Amazon.com Inc.", "sector": "Consumer Cyclical"},
+    {"ticker": "TSLA", "name": "Tesla Inc.", "sector": "Consumer Cyclical"},
+    {"ticker": "NVDA", "name": "NVIDIA Corporation", "sector": "Technology"},
+    {"ticker": "META", "name": "Meta Platforms Inc.", "sector": "Technology"},
+    {"ticker": "NFLX", "name": "Netflix Inc.", "sector": "Communication Services"},
+    {"ticker": "JPM", "name": "JPMorgan Chase & Co.", "sector": "Financial Services"},
+    {"ticker": "JNJ", "name": "Johnson & Johnson", "sector": "Healthcare"},
+    {"ticker": "PG", "name": "Procter & Gamble Co.", "sector": "Consumer Defensive"},
+    {"ticker": "TGT", "name": "Target Corporation", "sector": "Consumer Cyclical"},
+    {"ticker": "WMT", "name": "Walmart Inc.", "sector": "Consumer Defensive"},
+    {"ticker": "HD", "name": "Home Depot Inc.", "sector": "Consumer Cyclical"},
+    {"ticker": "DIS", "name": "Walt Disney Co.", "sector": "Communication Services"},
+    {"ticker": "KO", "name": "Coca-Cola Co.", "sector": "Consumer Defensive"},
+    {"ticker": "PEP", "name": "PepsiCo Inc.", "sector": "Consumer Defensive"},
+    {"ticker": "V", "name": "Visa Inc.", "sector": "Financial Services"},
+    {"ticker": "MA", "name": "Mastercard Inc.", "sector": "Financial Services"},
+    {"ticker": "UNH", "name": "UnitedHealth Group Inc.", "sector": "Healthcare"},
+    {"ticker": "PFE", "name": "Pfizer Inc.", "sector": "Healthcare"},
+    {"ticker": "ABT", "name": "Abbott Laboratories", "sector": "Healthcare"},
+    {"ticker": "MRK", "name": "Merck & Co. Inc.", "sector": "Healthcare"},
+    {"ticker": "TMO", "name": "Thermo Fisher Scientific Inc.", "sector": "Healthcare"},
+    {"ticker": "AVGO", "name": "Broadcom Inc.", "sector": "Technology"},
+    {"ticker": "CRM", "name": "Salesforce Inc.", "sector": "Technology"},
+    {"ticker": "ADBE", "name": "Adobe Inc.", "sector": "Technology"},
+    {"ticker": "ORCL", "name": "Oracle Corporation", "sector": "Technology"},
+    {"ticker": "INTC", "name": "Intel Corporation", "sector": "Technology"},
+    {"ticker": "AMD", "name": "Advanced Micro Devices Inc.", "sector": "Technology"},
+    {"ticker": "QCOM", "name": "Qualcomm Inc.", "sector": "Technology"},
+    {"ticker": "CSCO", "name": "Cisco Systems Inc.", "sector": "Technology"},
+    {"ticker": "IBM", "name": "International Business Machines Corp.", "sector": "Technology"},
+    {"ticker": "BA", "name": "Boeing Co.", "sector": "Industrials"},
+    {"ticker": "CAT", "name": "Caterpillar Inc.", "sector": "Industrials"},
+    {"ticker": "GE", "name": "General Electric Co.", "sector": "Industrials"},
+    {"ticker": "MMM", "name": "3M Co.", "sector": "Industrials"},
+    {"ticker": "HON", "name": "Honeywell International Inc.", "sector": "Industrials"},
+    {"ticker": "XOM", "name": "Exxon Mobil Corp.", "sector": "Energy"},
+    {"ticker": "CVX", "name": "Chevron Corporation", "sector": "Energy"},
+    {"ticker": "COP", "name": "ConocoPhillips", "sector": "Energy"},
+    {"ticker": "SLB", "name": "Schlumberger Ltd.", "sector": "Energy"},
+    {"ticker": "EOG", "name": "EOG Resources Inc.", "sector": "Energy"},
+)
+
+
+@lru_cache(maxsize=1024)
+def _get_info(ticker: str, time_bucket: int) -> Dict:
+    # time_bucket only keys the cache, so each ticker is fetched at most once per TTL window.
+    # The shared Ticker memoizes .info, so it's replaced once older than INFO_TTL_SECONDS too.
+    return get_ticker(ticker, max_age=INFO_TTL_SECONDS).info
+
+
+def _fetch_info(ticker: str) -> Optional[Dict]:
+    """
+    Fetch yfinance .info for one ticker (cached for INFO_TTL_SECONDS), or None if the lookup fails.
+    """
+    try:
+        return _get_info(ticker, int(time.time() // INFO_TTL_SECONDS))
+    except Exception:
+        return None
+
+
+def _fetch_infos(tickers: List[str], max_workers: int = 16) -> Dict[str, Optional[Dict]]:
+    """
+    Fetch .info for several tickers concurrently.
+    Returns a dict: {ticker: info or None}
+    """
+    if not tickers:
+        return {}
+    with ThreadPoolExecutor(max_workers=min(max_workers, len(tickers))) as executor:
+        return dict(zip(tickers, executor.map(_fetch_info, tickers)))
 
 
 def fetch_current_prices(tickers: List[str]) -> Dict[str, float]:
     """
-    Fetch current prices for a list of tickers using yfinance.
+    Fetch current prices for a list of tickers, batching 20 symbols per Yahoo request.
+    Tickers the batch can't resolve fall back to a per-ticker fast_info lookup, then .info.
     Returns a dict: {ticker: price}
     """
-    prices = {}
+    wanted = set(tickers)
+    prices = {ticker: quote["price"] for ticker, quote in get_bulk_prices(list(tickers)).items() if ticker in wanted}
     for ticker in tickers:
+        if ticker in prices:
+            continue
+        # fast_info reads just the price instead of the full .info payload
         try:
-            info = yf.Ticker(ticker).info
-            price = info.get("regularMarketPrice")
-            if price is not None:
-                prices[ticker] = price
+            price = get_ticker(ticker).fast_info.last_price
         except Exception:
-            prices[ticker] = None
+            price = None
+        if price is None:
+            info = _fetch_info(ticker)
+            if info is None:
+                prices[ticker] = None
+                continue
+            price = info.get("regularMarketPrice")
+        if price is not None:
+            prices[ticker] = price
     return prices
 
 
@@ -35,35 +134,20 @@ def search_companies(query: str, max_results: int = 10) -> List[Dict]:
         return []
     
     query = query.lower().strip()
+    entries, grams = _search_index()
     
-    # Get popular stocks for local search
-    popular_stocks = get_popular_stocks()
-    matches = []
-    
-    # Search in popular stocks first (faster and more reliable)
-    for stock in popular_stocks:
-        stock_name = stock['name'].lower()
-        stock_ticker = stock['ticker'].lower()
-        
-        # Check if query matches ticker or company name
-        if (query in stock_ticker or 
-            query in stock_name or
-            stock_ticker.startswith(query) or
-            stock_name.startswith(query) or
-            any(word.startswith(query) for word in stock_name.split())):
-            matches.append(stock)
+    # Every match contains the query's first three characters, so the gram index narrows
+    # the scan to candidates that could match. Queries no longer than a gram are indexed
+    # whole, so their candidates already are the matches and need no substring check.
+    key = query[:SEARCH_GRAM_SIZE]
+    candidates = sorted(grams.get(key, ())) if key else range(len(entries))
+    needs_check = len(query) > SEARCH_GRAM_SIZE
     
-    # Sort by relevance (exact matches first, then partial matches)
-    def sort_key(stock):
-        stock_name = stock['name'].lower()
-        stock_ticker = stock['ticker'].lower()
-        
+    def rank(stock_ticker, stock_name):
         # Exact ticker match gets highest priority
-        if stock_ticker == query:
-            return 0
-        # Ticker starts with query
-        elif stock_ticker.startswith(query):
-            return 1
+        if stock_ticker.startswith(query):
+            # Ticker starts with query
+            return 0 if len(stock_ticker) == len(query) else 1
         # Company name starts with query
         elif stock_name.startswith(query):
             return 2
@@ -71,62 +155,36 @@ def search_companies(query: str, max_results: int = 10) -> List[Dict]:
         else:
             return 3
     
-    matches.sort(key=sort_key)
-    
-    # Return top matches
-    return matches[:max_results]
+    # Ties keep popular-list order, as the previous stable sort did
+    matches = (
+        (rank(entries[idx][0], entries[idx][1]), idx)
+        for idx in candidates
+        if not needs_check or query in entries[idx][0] or query in entries[idx][1]
+    )
+    return [entries[idx][2] for _, idx in heapq.nsmallest(max_results, matches)]
 
 
-def get_popular_stocks() -> List[Dict]:
+@lru_cache(maxsize=None)
+def _search_index():
     """
-    Return a list of popular stocks for quick reference.
+    Lowercased (ticker, name, stock) entries for the popular stocks, plus a map from every
+    1-3 character substring of a ticker or name to the indices of entries containing it.
     """
-    popular_stocks = [
-        {"ticker": "AAPL", "name": "Apple Inc.", "sector": "Technology"},
-        {"ticker": "MSFT", "name": "Microsoft Corporation", "sector": "Technology"},
-        {"ticker": "GOOGL", "name": "Alphabet Inc.", "sector": "Technology"},
-        {"ticker": "AMZN", "name": "Amazon.com Inc.", "sector": "Consumer Cyclical"},
-        {"ticker": "TSLA", "name": "Tesla Inc.", "sector": "Consumer Cyclical"},
-        {"ticker": "NVDA", "name": "NVIDIA Corporation", "sector": "Technology"},
-        {"ticker": "META", "name": "Meta Platforms Inc.", "sector": "Technology"},
-        {"ticker": "NFLX", "name": "Netflix Inc.", "sector": "Communication Services"},
-        {"ticker": "JPM", "name": "JPMorgan Chase & Co.", "sector": "Financial Services"},
-        {"ticker": "JNJ", "name": "Johnson & Johnson", "sector": "Healthcare"},
-        {"ticker": "PG", "name": "Procter & Gamble Co.", "sector": "Consumer Defensive"},
-        {"ticker": "TGT", "name": "Target Corporation", "sector": "Consumer Cyclical"},
-        {"ticker": "WMT", "name": "Walmart Inc.", "sector": "Consumer Defensive"},
-        {"ticker": "HD", "name": "Home Depot Inc.", "sector": "Consumer Cyclical"},
-        {"ticker": "DIS", "name": "Walt Disney Co.", "sector": "Communication Services"},
-        {"ticker": "KO", "name": "Coca-Cola Co.", "sector": "Consumer Defensive"},
-        {"ticker": "PEP", "name": "PepsiCo Inc.", "sector": "Consumer Defensive"},
-        {"ticker": "V", "name": "Visa Inc.", "sector": "Financial Services"},
-        {"ticker": "MA", "name": "Mastercard Inc.", "sector": "Financial Services"},
-        {"ticker": "UNH", "name": "UnitedHealth Group Inc.", "sector": "Healthcare"},
-        {"ticker": "PFE", "name": "Pfizer Inc.", "sector": "Healthcare"},
-        {"ticker": "ABT", "name": "Abbott Laboratories", "sector": "Healthcare"},
-        {"ticker": "MRK", "name": "Merck & Co. Inc.", "sector": "Healthcare"},
-        {"ticker": "TMO", "name": "Thermo Fisher Scientific Inc.", "sector": "Healthcare"},
-        {"ticker": "AVGO", "name": "Broadcom Inc.", "sector": "Technology"},
-        {"ticker": "CRM", "name": "Salesforce Inc.", "sector": "Technology"},
-        {"ticker": "ADBE", "name": "Adobe Inc.", "sector": "Technology"},
-        {"ticker": "ORCL", "name": "Oracle Corporation", "sector": "Technology"},
-        {"ticker": "INTC", "name": "Intel Corporation", "sector": "Technology"},
-        {"ticker": "AMD", "name": "Advanced Micro Devices Inc.", "sector": "Technology"},
-        {"ticker": "QCOM", "name": "Qualcomm Inc.", "sector": "Technology"},
-        {"ticker": "CSCO", "name": "Cisco Systems Inc.", "sector": "Technology"},
-        {"ticker": "IBM", "name": "International Business Machines Corp.", "sector": "Technology"},
-        {"ticker": "BA", "name": "Boeing Co.", "sector": "Industrials"},
-        {"ticker": "CAT", "name": "Caterpillar Inc.", "sector": "Industrials"},
-        {"ticker": "GE", "name": "General Electric Co.", "sector": "Industrials"},
-        {"ticker": "MMM", "name": "3M Co.", "sector": "Industrials"},
-        {"ticker": "HON", "name": "Honeywell International Inc.", "sector": "Industrials"},
-        {"ticker": "XOM", "name": "Exxon Mobil Corp.", "sector": "Energy"},
-        {"ticker": "CVX", "name": "Chevron Corporation", "sector": "Energy"},
-        {"ticker": "COP", "name": "ConocoPhillips", "sector": "Energy"},
-        {"ticker": "SLB", "name": "Schlumberger Ltd.", "sector": "Energy"},
-        {"ticker": "EOG", "name": "EOG Resources Inc.", "sector": "Energy"},
-    ]
-    return popular_stocks
+    entries = [(stock['ticker'].lower(), stock['name'].lower(), stock) for stock in _POPULAR_STOCKS]
+    grams = defaultdict(set)
+    for idx, (stock_ticker, stock_name, _) in enumerate(entries):
+        for text in (stock_ticker, stock_name):
+            for size in range(1, SEARCH_GRAM_SIZE + 1):
+                for start in range(len(text) - size + 1):
+                    grams[text[start:start + size]].add(idx)
+    return entries, dict(grams)
+
+
+def get_popular_stocks() -> Tuple[Dict, ...]:
+    """
+    Return the popular stocks for quick reference.
+    """
+    return _POPULAR_STOCKS
 
 
 def get_stock_sectors(tickers: List[str]) -> Dict[str, str]:
@@ -134,26 +192,24 @@ def get_stock_sectors(tickers: List[str]) -> Dict[str, str]:
     Fetch sector information for a list of tickers using yfinance.
     Returns a dict: {ticker: sector}
     """
-    sectors = {}
-    for ticker in tickers:
-        try:
-            info = yf.Ticker(ticker).info
-            sector = info.get("sector", "Unknown")
-            sectors[ticker] = sector
-        except Exception:
-            sectors[ticker] = "Unknown"
-    return sectors
+    return {
+        ticker: info.get("sector", "Unknown") if info is not None else "Unknown"
+        for ticker, info in _fetch_infos(tickers).items()
+    }
+
 
+_TECH_SECTOR_RE = re.compile(
+    r"technology|software|semiconductor|internet|computer|electronics|telecommunications|tech",
+    re.IGNORECASE
+)
 
+
+@lru_cache(maxsize=256)
 def is_tech_stock(sector: str) -> bool:
     """
     Determine if a stock is in the technology sector based on its sector name.
     """
-    tech_keywords = [
-        "technology", "software", "semiconductor", "internet", 
-        "computer", "electronics", "telecommunications", "tech"
-    ]
-    return any(keyword in sector.lower() for keyword in tech_keywords)
+    return bool(_TECH_SECTOR_RE.search(sector or ""))
 
 
 def allocate_portfolio_with_sector_preference(
@@ -161,7 +217,8 @@ def allocate_portfolio_with_sector_preference(
     tickers: List[str],
     prices: Dict[str, float],
     tech_preference: float = 0.6,
-    custom_weights: Optional[Dict[str, float]] = None
+    custom_weights: Optional[Dict[str, float]] = None,
+    stock_info: Optional[Dict[str, Dict]] = None
 ) -> List[Dict]:
     """
     Allocate budget across tickers with sector-based weighting.
@@ -172,6 +229,7 @@ def allocate_portfolio_with_sector_preference(
         prices: Dict of current prices {ticker: price}
         tech_preference: Percentage of budget to allocate to tech stocks (0.0 to 1.0)
         custom_weights: Optional custom weights per stock (overrides sector preference)
+        stock_info: Optional output of get_stock_info(); avoids refetching sectors
     
     Returns:
         List of dicts: [{ticker, price, weight, allocated, shares, sector, is_tech}]
@@ -180,22 +238,28 @@ def allocate_portfolio_with_sector_preference(
         return []
     
     # Get sector information
-    sectors = get_stock_sectors(tickers)
+    if stock_info is not None:
+        sectors = {t: stock_info.get(t, {}).get('sector', 'Unknown') for t in tickers}
+    else:
+        sectors = get_stock_sectors(tickers)
     
-    # Separate tech and non-tech stocks
-    tech_stocks = [t for t in tickers if is_tech_stock(sectors.get(t, "Unknown"))]
-    non_tech_stocks = [t for t in tickers if not is_tech_stock(sectors.get(t, "Unknown"))]
+    # Separate tech and non-tech stocks in one pass, remembering each ticker's classification
+    tech_stocks, non_tech_stocks, is_tech_map = [], [], {}
+    for ticker in tickers:
+        is_tech = is_tech_stock(sectors.get(ticker, "Unknown"))
+        is_tech_map[ticker] = is_tech
+        (tech_stocks if is_tech else non_tech_stocks).append(ticker)
     
     # If custom weights provided, use them instead of sector preference
     if custom_weights:
-        print(f"Debug - Using custom weights: {custom_weights}")
+        logger.debug("Using custom weights: %s", custom_weights)
         total_weight = sum(custom_weights.values())
-        print(f"Debug - Total weight before normalization: {total_weight}")
+        logger.debug("Total weight before normalization: %s", total_weight)
         if total_weight > 0:
             weights = {k: v/total_weight for k, v in custom_weights.items()}
         else:
             weights = {ticker: 1/len(tickers) for ticker in tickers}
-        print(f"Debug - Normalized weights: {weights}")
+        logger.debug("Normalized weights: %s", weights)
     else:
         # Apply sector-based weighting
         weights = {}
@@ -227,42 +291,36 @@ def allocate_portfolio_with_sector_preference(
             for ticker in tickers:
                 weights[ticker] = weight_per_stock
     
-    # Calculate allocation
-    allocation = []
-    total_allocated = 0
+    # Calculate allocation for all tickers at once
+    # (method lookups are bound to locals since they run once per ticker)
+    price_get, weight_get, sector_get = prices.get, weights.get, sectors.get
+    price_list = [price_get(ticker) for ticker in tickers]
+    weight_list = [weight_get(ticker, 0) for ticker in tickers]
+    prices_arr = np.array([price or 0.0 for price in price_list], dtype=np.float64)
+    valid = prices_arr > 0
+    safe_prices = np.where(valid, prices_arr, 1.0)
     
-    for ticker in tickers:
-        price = prices.get(ticker)
-        weight = weights.get(ticker, 0)
-        
-        if price and price > 0:
-            # Calculate target allocation based on weight
-            target_allocation = budget * weight
-            
-            # Smart allocation: Try to use more budget if other stocks can't use theirs
-            # Calculate shares (integer division)
-            shares = int(target_allocation // price)
-            allocated = shares * price
-            
-            # Calculate what we could buy with fractional shares
-            fractional_shares = target_allocation / price
-            fractional_allocated = target_allocation
-            
-            # If we can't buy any shares, show the fractional option
-            if shares == 0 and fractional_shares > 0:
-                print(f"Debug - {ticker}: Target=${target_allocation:.2f}, Price=${price:.2f}, Fractional shares={fractional_shares:.2f}")
-        else:
-            shares = 0
-            allocated = 0
-            fractional_shares = 0
-            fractional_allocated = 0
-        
-        sector = sectors.get(ticker, "Unknown")
-        is_tech = is_tech_stock(sector)
-        
-        total_allocated += allocated
+    # Target allocation per stock based on weight, and the whole shares it buys
+    target_arr = np.where(valid, budget * np.array(weight_list, dtype=np.float64), 0.0)
+    shares_arr = np.floor_divide(target_arr, safe_prices).astype(np.int64)
+    allocated_arr = np.where(valid, shares_arr * prices_arr, 0.0)
+    
+    # What we could buy with fractional shares
+    fractional_arr = target_arr / safe_prices
+    
+    total_allocated = float(allocated_arr.sum())
+    
+    allocation = []
+    append = allocation.append
+    for ticker, price, weight, shares, allocated, fractional_shares, fractional_allocated in zip(
+        tickers, price_list, weight_list, shares_arr.tolist(), allocated_arr.tolist(),
+        fractional_arr.tolist(), target_arr.tolist()
+    ):
+        # If we can't buy any shares, show the fractional option
+        if shares == 0 and fractional_shares > 0:
+            logger.debug("%s: Target=$%.2f, Price=$%.2f, Fractional shares=%.2f", ticker, fractional_allocated, price, fractional_shares)
         
-        allocation.append({
+        append({
             "ticker": ticker,
             "price": price,
             "weight": weight,
@@ -270,14 +328,14 @@ def allocate_portfolio_with_sector_preference(
             "shares": shares,
             "fractional_shares": fractional_shares if shares == 0 else shares,
             "fractional_allocated": fractional_allocated if shares == 0 else allocated,
-            "sector": sector,
-            "is_tech": is_tech
+            "sector": sector_get(ticker, "Unknown"),
+            "is_tech": is_tech_map[ticker]
         })
     
     # Enhanced budget redistribution: Try to use unused budget more efficiently
     unused_budget = budget - total_allocated
     if unused_budget > budget * 0.05:  # If more than 5% unused (more aggressive)
-        print(f"Debug - Attempting budget redistribution for unused ${unused_budget:.2f}")
+        logger.debug("Attempting budget redistribution for unused $%.2f", unused_budget)
         
         # Strategy 1: Find stocks that could use more budget (those with 0 shares but fractional potential)
         redistributable = []
@@ -287,6 +345,7 @@ def allocate_portfolio_with_sector_preference(
                 max_additional = min(unused_budget, item['fractional_allocated'] - item['allocated'])
                 if max_additional > 0:
                     redistributable.append({
+                        'item': item,
                         'ticker': item['ticker'],
                         'price': item['price'],
                         'max_additional': max_additional,
@@ -304,19 +363,17 @@ def allocate_portfolio_with_sector_preference(
             actual_additional = additional_shares * redist_item['price']
             
             if actual_additional > 0:
-                # Update the allocation
-                for item in allocation:
-                    if item['ticker'] == redist_item['ticker']:
-                        item['shares'] += additional_shares
-                        item['allocated'] += actual_additional
-                        total_allocated += actual_additional
-                        unused_budget -= actual_additional
-                        print(f"Debug - Redistributed ${actual_additional:.2f} to {redist_item['ticker']} (${additional_shares} shares)")
-                        break
+                # Update the allocation entry in place
+                item = redist_item['item']
+                item['shares'] += additional_shares
+                item['allocated'] += actual_additional
+                total_allocated += actual_additional
+                unused_budget -= actual_additional
+                logger.debug("Redistributed $%.2f to %s (%d shares)", actual_additional, redist_item['ticker'], additional_shares)
         
         # Strategy 2: If still unused budget, try to add more shares to existing positions
         if unused_budget > budget * 0.05:  # Still more than 5% unused
-            print(f"Debug - Still ${unused_budget:.2f} unused, trying to add more shares to existing positions")
+            logger.debug("Still $%.2f unused, trying to add more shares to existing positions", unused_budget)
             
             # Find stocks that already have shares and could use more
             expandable = []
@@ -326,6 +383,7 @@ def allocate_portfolio_with_sector_preference(
                     max_additional_shares = int(unused_budget // item['price'])
                     if max_additional_shares > 0:
                         expandable.append({
+                            'item': item,
                             'ticker': item['ticker'],
                             'price': item['price'],
                             'current_shares': item['shares'],
@@ -346,21 +404,26 @@ def allocate_portfolio_with_sector_preference(
                 cost_to_add = shares_to_add * expand_item['price']
                 
                 if cost_to_add > 0:
-                    # Update the allocation
-                    for item in allocation:
-                        if item['ticker'] == expand_item['ticker']:
-                            item['shares'] += shares_to_add
-                            item['allocated'] += cost_to_add
-                            total_allocated += cost_to_add
-                            unused_budget -= cost_to_add
-                            print(f"Debug - Added {shares_to_add} more shares to {expand_item['ticker']} for ${cost_to_add:.2f}")
-                            break
+                    # Update the allocation entry in place
+                    item = expand_item['item']
+                    item['shares'] += shares_to_add
+                    item['allocated'] += cost_to_add
+                    total_allocated += cost_to_add
+                    unused_budget -= cost_to_add
+                    logger.debug("Added %d more shares to %s for $%.2f", shares_to_add, expand_item['ticker'], cost_to_add)
     
     # Add debug information
-    print(f"Debug - Budget: ${budget}, Total Allocated: ${total_allocated:.2f}")
-    print(f"Debug - Unused budget: ${budget - total_allocated:.2f}")
-    for item in allocation:
-        print(f"Debug - {item['ticker']}: Weight={item['weight']:.1%}, Shares={item['shares']}, Price=${item['price']:.2f}, Allocated=${item['allocated']:.2f}")
+    if logger.isEnabledFor(logging.DEBUG):
+        lines = [
+            f"Budget: ${budget}, Total Allocated: ${total_allocated:.2f}",
+            f"Unused budget: ${budget - total_allocated:.2f}",
+        ]
+        lines += [
+            f"{item['ticker']}: Weight={item['weight']:.1%}, Shares={item['shares']}, "
+            f"Price=${item['price'] or 0:.2f}, Allocated=${item['allocated']:.2f}"
+            for item in allocation
+        ]
+        logger.debug("\n".join(lines))
     
     return allocation
 
@@ -385,102 +448,138 @@ def allocate_portfolio(
         total = sum(weights.values())
         weights = {k: v/total for k, v in weights.items()}
 
-    allocation = []
-    for ticker in tickers:
-        price = prices.get(ticker)
-        weight = weights.get(ticker, 0)
-        allocated = budget * weight if price else 0
-        shares = int(allocated // price) if price else 0
-        allocation.append({
+    price_list = [prices.get(ticker) for ticker in tickers]
+    weight_list = [weights.get(ticker, 0) for ticker in tickers]
+    has_price = np.array([bool(price) for price in price_list])
+    prices_arr = np.array([price if price else 1.0 for price in price_list], dtype=np.float64)
+    allocated_arr = np.where(has_price, budget * np.array(weight_list, dtype=np.float64), 0.0)
+    shares_arr = np.floor_divide(allocated_arr, prices_arr).astype(np.int64)
+
+    return [
+        {
             "ticker": ticker,
             "price": price,
             "weight": weight,
             "allocated": allocated,
             "shares": shares
-        })
-    return allocation 
+        }
+        for ticker, price, weight, allocated, shares in zip(
+            tickers, price_list, weight_list, allocated_arr.tolist(), shares_arr.tolist()
+        )
+    ]
 
 
-def generate_weight_recommendations(tickers: List[str], tech_preference: float = 0.6) -> Dict[str, float]:
+def get_stock_info(tickers: List[str]) -> Dict[str, Dict]:
+    """
+    Fetch the metadata used for weighting and allocation, once per ticker.
+    Results are cached per selection for RECOMMENDATION_TTL_SECONDS.
+    
+    Returns:
+        Dict: {ticker: {sector, market_cap, beta, pe_ratio, dividend_yield, price, available}}
+    """
+    stock_info = _cached_stock_info(tuple(sorted(set(tickers))), _recommendation_bucket())
+    return {ticker: stock_info[ticker] for ticker in tickers}
+
+
+@lru_cache(maxsize=128)
+def _cached_stock_info(ticker_key: Tuple[str, ...], time_bucket: int) -> Dict[str, Dict]:
+    stock_info = {}
+    for ticker, info in _fetch_infos(list(ticker_key)).items():
+        if info is not None:
+            stock_info[ticker] = {
+                'sector': info.get('sector', 'Unknown'),
+                'market_cap': info.get('marketCap', 0),
+                'beta': info.get('beta', 1.0),
+                'pe_ratio': info.get('trailingPE', 0),
+                'dividend_yield': info.get('dividendYield', 0) or 0,
+                'price': info.get('regularMarketPrice', 0),
+                'available': True
+            }
+        else:
+            stock_info[ticker] = {
+                'sector': 'Unknown',
+                'market_cap': 0,
+                'beta': 1.0,
+                'pe_ratio': 0,
+                'dividend_yield': 0,
+                'price': 0,
+                'available': False
+            }
+    return stock_info
+
+
+def build_portfolio(
+    budget: float,
+    tickers: List[str],
+    prices: Dict[str, float],
+    tech_preference: float = 0.6,
+    custom_weights: Optional[Dict[str, float]] = None
+) -> List[Dict]:
+    """
+    Recommend weights (unless custom weights are given) and allocate the budget,
+    fetching each ticker's metadata only once for both steps.
+    """
+    stock_info = get_stock_info(tickers)
+    weights = custom_weights or generate_weight_recommendations(tickers, tech_preference, stock_info)
+    return allocate_portfolio_with_sector_preference(
+        budget, tickers, prices, tech_preference, weights, stock_info
+    )
+
+
+def generate_weight_recommendations(
+    tickers: List[str],
+    tech_preference: float = 0.6,
+    stock_info: Optional[Dict[str, Dict]] = None
+) -> Dict[str, float]:
     """
     Generate intelligent weight recommendations based on market conditions and stock characteristics.
     
     Args:
         tickers: List of stock tickers
         tech_preference: User's tech sector preference (0.0 to 1.0)
+        stock_info: Optional output of get_stock_info(); fetched here when omitted
     
     Returns:
         Dict of recommended weights: {ticker: weight}
     """
+    if stock_info is None:
+        weights = _cached_weight_recommendations(
+            tuple(sorted(tickers)), round(tech_preference, 3), _recommendation_bucket()
+        )
+        return {ticker: weights[ticker] for ticker in tickers}
+    
     try:
-        # Get stock information
-        stock_info = {}
-        for ticker in tickers:
-            try:
-                ticker_obj = yf.Ticker(ticker)
-                info = ticker_obj.info
-                stock_info[ticker] = {
-                    'sector': info.get('sector', 'Unknown'),
-                    'market_cap': info.get('marketCap', 0),
-                    'beta': info.get('beta', 1.0),
-                    'pe_ratio': info.get('trailingPE', 0),
-                    'dividend_yield': info.get('dividendYield', 0) or 0,
-                    'price': info.get('regularMarketPrice', 0)
-                }
-            except Exception:
-                stock_info[ticker] = {
-                    'sector': 'Unknown',
-                    'market_cap': 0,
-                    'beta': 1.0,
-                    'pe_ratio': 0,
-                    'dividend_yield': 0,
-                    'price': 0
-                }
+        # Calculate base weights using multiple factors, for all tickers at once
+        unique_tickers = list(dict.fromkeys(tickers))
+        infos = [stock_info[ticker] for ticker in unique_tickers]
+        is_tech = np.array([is_tech_stock(info['sector']) for info in infos], dtype=bool)
+        caps = np.array([info['market_cap'] for info in infos], dtype=np.float64)
+        betas = np.array([info['beta'] for info in infos], dtype=np.float64)
+        dividends = np.array([info['dividend_yield'] for info in infos], dtype=np.float64)
+        pes = np.array([info['pe_ratio'] for info in infos], dtype=np.float64)
         
-        # Calculate base weights using multiple factors
-        weights = {}
-        total_score = 0
+        scores = np.ones(len(unique_tickers))  # Base score
         
-        for ticker, info in stock_info.items():
-            score = 1.0  # Base score
-            
-            # Factor 1: Sector preference (tech vs non-tech)
-            if is_tech_stock(info['sector']):
-                score *= (1 + tech_preference)  # Boost tech stocks
-            else:
-                score *= (1 - tech_preference * 0.5)  # Reduce non-tech stocks
-            
-            # Factor 2: Market cap (prefer larger, more stable companies)
-            if info['market_cap'] > 100e9:  # > $100B
-                score *= 1.2
-            elif info['market_cap'] > 10e9:  # > $10B
-                score *= 1.1
-            elif info['market_cap'] < 1e9:  # < $1B
-                score *= 0.8
-            
-            # Factor 3: Beta (prefer lower volatility)
-            if info['beta'] < 0.8:
-                score *= 1.1  # Low volatility
-            elif info['beta'] > 1.5:
-                score *= 0.9  # High volatility
-            
-            # Factor 4: Dividend yield (bonus for income)
-            if info['dividend_yield'] > 0.02:  # > 2%
-                score *= 1.05
-            
-            # Factor 5: P/E ratio (prefer reasonable valuations)
-            if 0 < info['pe_ratio'] < 25:
-                score *= 1.05
-            elif info['pe_ratio'] > 50:
-                score *= 0.9
-            
-            weights[ticker] = score
-            total_score += score
+        # Factor 1: Sector preference (boost tech stocks, reduce non-tech stocks)
+        scores *= np.where(is_tech, 1 + tech_preference, 1 - tech_preference * 0.5)
+        
+        # Factor 2: Market cap (prefer larger, more stable companies: > $100B, > $10B, < $1B)
+        scores *= np.select([caps > 100e9, caps > 10e9, caps < 1e9], [1.2, 1.1, 0.8], default=1.0)
+        
+        # Factor 3: Beta (prefer lower volatility)
+        scores *= np.select([betas < 0.8, betas > 1.5], [1.1, 0.9], default=1.0)
+        
+        # Factor 4: Dividend yield (bonus for income above 2%)
+        scores *= np.where(dividends > 0.02, 1.05, 1.0)
+        
+        # Factor 5: P/E ratio (prefer reasonable valuations)
+        scores *= np.select([(pes > 0) & (pes < 25), pes > 50], [1.05, 0.9], default=1.0)
+        
+        total_score = scores.sum()
         
         # Normalize weights to sum to 1.0
         if total_score > 0:
-            for ticker in weights:
-                weights[ticker] = weights[ticker] / total_score
+            weights = dict(zip(unique_tickers, (scores / total_score).tolist()))
         else:
             # Fallback to equal weights
             equal_weight = 1.0 / len(tickers)
@@ -494,59 +593,70 @@ def generate_weight_recommendations(tickers: List[str], tech_preference: float =
         return {ticker: equal_weight for ticker in tickers}
 
 
-def get_market_insights(tickers: List[str]) -> Dict[str, str]:
+def _recommendation_bucket() -> int:
+    return int(time.time() // RECOMMENDATION_TTL_SECONDS)
+
+
+# Keyed on the sorted tickers, so reruns with the same selection in any order reuse the result.
+# Callers get a fresh dict each time, so the cached one is never mutated.
+@lru_cache(maxsize=128)
+def _cached_weight_recommendations(ticker_key: Tuple[str, ...], tech_preference: float, time_bucket: int) -> Dict[str, float]:
+    tickers = list(ticker_key)
+    return generate_weight_recommendations(tickers, tech_preference, get_stock_info(tickers))
+
+
+# Insight text per non-tech sector, and (threshold, text) bands checked top-down with ">"
+_SECTOR_INSIGHTS = {
+    'Healthcare': "🏥 Healthcare - defensive play",
+    'Financial Services': "🏦 Financial - interest rate sensitive",
+    'Consumer Cyclical': "🛒 Consumer - economic cycle dependent",
+}
+_MARKET_CAP_INSIGHTS = ((100e9, "💎 Large cap - stable"), (10e9, "📈 Mid cap - balanced"))
+_DIVIDEND_INSIGHTS = ((0.03, "💰 High dividend"), (0.01, "💵 Moderate dividend"))
+
+
+def _band_insight(value: float, bands, default: Optional[str] = None) -> Optional[str]:
+    return next((text for threshold, text in bands if value > threshold), default)
+
+
+def get_market_insights(tickers: List[str], stock_info: Optional[Dict[str, Dict]] = None) -> Dict[str, str]:
     """
     Generate market insights and recommendations for the selected stocks.
     
     Args:
         tickers: List of stock tickers
+        stock_info: Optional output of get_stock_info(); fetched here when omitted
     
     Returns:
         Dict of insights: {ticker: insight}
     """
+    if stock_info is None:
+        insights = _cached_market_insights(tuple(sorted(tickers)), _recommendation_bucket())
+        return {ticker: insights[ticker] for ticker in tickers}
+    
     insights = {}
     
     try:
         for ticker in tickers:
+            info = stock_info.get(ticker)
+            if not info or not info.get('available', True):
+                insights[ticker] = "📊 Limited data available"
+                continue
+            
             try:
-                ticker_obj = yf.Ticker(ticker)
-                info = ticker_obj.info
-                
-                insight_parts = []
-                
-                # Sector analysis
-                sector = info.get('sector', 'Unknown')
-                if is_tech_stock(sector):
-                    insight_parts.append("🖥️ Tech sector - growth potential")
-                elif sector == 'Healthcare':
-                    insight_parts.append("🏥 Healthcare - defensive play")
-                elif sector == 'Financial Services':
-                    insight_parts.append("🏦 Financial - interest rate sensitive")
-                elif sector == 'Consumer Cyclical':
-                    insight_parts.append("🛒 Consumer - economic cycle dependent")
-                
-                # Market cap analysis
-                market_cap = info.get('marketCap', 0)
-                if market_cap > 100e9:
-                    insight_parts.append("💎 Large cap - stable")
-                elif market_cap > 10e9:
-                    insight_parts.append("📈 Mid cap - balanced")
-                else:
-                    insight_parts.append("🚀 Small cap - growth potential")
-                
-                # Volatility analysis
-                beta = info.get('beta', 1.0)
-                if beta < 0.8:
-                    insight_parts.append("🛡️ Low volatility")
-                elif beta > 1.5:
-                    insight_parts.append("⚡ High volatility")
-                
-                # Dividend analysis
-                dividend_yield = info.get('dividendYield', 0) or 0
-                if dividend_yield > 0.03:
-                    insight_parts.append("💰 High dividend")
-                elif dividend_yield > 0.01:
-                    insight_parts.append("💵 Moderate dividend")
+                sector = info['sector']
+                beta = info['beta']
+                insight_parts = [
+                    # Sector analysis
+                    "🖥️ Tech sector - growth potential" if is_tech_stock(sector) else _SECTOR_INSIGHTS.get(sector),
+                    # Market cap analysis
+                    _band_insight(info['market_cap'], _MARKET_CAP_INSIGHTS, "🚀 Small cap - growth potential"),
+                    # Volatility analysis
+                    "🛡️ Low volatility" if beta < 0.8 else "⚡ High volatility" if beta > 1.5 else None,
+                    # Dividend analysis
+                    _band_insight(info['dividend_yield'], _DIVIDEND_INSIGHTS),
+                ]
+                insight_parts = [part for part in insight_parts if part]
                 
                 insights[ticker] = " | ".join(insight_parts) if insight_parts else "📊 Standard stock"
                 
@@ -557,4 +667,10 @@ def get_market_insights(tickers: List[str]) -> Dict[str, str]:
         for ticker in tickers:
             insights[ticker] = "📊 Data unavailable"
     
-    return insights 
\ No newline at end of file
+    return insights
+
+
+@lru_cache(maxsize=128)
+def _cached_market_insights(ticker_key: Tuple[str, ...], time_bucket: int) -> Dict[str, str]:
+    tickers = list(ticker_key)
+    return get_market_insights(tickers, get_stock_info(tickers))
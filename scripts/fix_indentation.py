@@ -0,0 +1,33 @@
+#!/usr/bin/env python3
+"""
+Dev-only helper: check app.py for indentation/syntax errors and reformat it with black.
+
+Run from the repo root: python scripts/fix_indentation.py [path]
+"""
+
+import ast
+import shutil
+import subprocess
+import sys
+
+
+def main(path="app.py"):
+    with open(path, "r") as f:
+        source = f.read()
+
+    try:
+        ast.parse(source, filename=path)
+    except SyntaxError as e:
+        # black can't reformat code that doesn't parse, so point at the problem instead
+        print(f"{path}:{e.lineno}: {e.msg}")
+        return 1
+
+    if shutil.which("black") is None:
+        print(f"{path} parses cleanly (install black to reformat it)")
+        return 0
+
+    return subprocess.run(["black", path]).returncode
+
+
+if __name__ == "__main__":
+    sys.exit(main(*sys.argv[1:2]))
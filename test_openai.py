@@ -2,19 +2,25 @@ from dotenv import load_dotenv
 import os
 import openai
 
-load_dotenv()
 
-api_key = os.getenv("OPENAI_API_KEY")
-print(f"Your OpenAI key is: {api_key}")
+def main():
+    load_dotenv()
 
-# Optional: test a simple call
-client = openai.OpenAI(api_key=api_key)
+    api_key = os.getenv("OPENAI_API_KEY")
+    print("OPENAI_API_KEY loaded" if api_key else "OPENAI_API_KEY missing")
 
-response = client.chat.completions.create(
-    model="gpt-3.5-turbo",  # or gpt-4 if you have access
-    messages=[
-        {"role": "user", "content": "Say hi!"}
-    ]
-)
+    # Optional: test a simple call
+    client = openai.OpenAI(api_key=api_key)
 
-print(response.choices[0].message.content)
\ No newline at end of file
+    response = client.chat.completions.create(
+        model="gpt-3.5-turbo",  # or gpt-4 if you have access
+        messages=[
+            {"role": "user", "content": "Say hi!"}
+        ]
+    )
+
+    print(response.choices[0].message.content)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,133 @@
+"""
+Equivalence checks for the compiled indicator and backtest kernels against
+the pandas formulations and the pure-Python backtest loop they replaced.
+"""
+import numpy as np
+import pandas as pd
+import pytest
+
+from utils.backtesting import Backtester
+from utils.indicator_kernels import ema, latest_indicators, rsi_wilder
+from utils.technical_analysis import TALIB_AVAILABLE, TechnicalAnalyzer
+
+RTOL = 1e-14
+
+
+def _random_walk(n, seed=0):
+    rng = np.random.default_rng(seed)
+    return 100 * np.exp(np.cumsum(rng.normal(0, 0.02, n)))
+
+
+def _pandas_rsi(close, period):
+    """Wilder's RSI in pandas: SMA seed over the first `period` changes, then RMA."""
+    change = pd.Series(close).diff()
+    rsi = pd.Series(np.nan, index=change.index)
+    if len(close) <= period:
+        return rsi.to_numpy()
+    averages = []
+    for values in (change.clip(lower=0), -change.clip(upper=0)):
+        seeded = pd.concat([pd.Series([values.iloc[1:period + 1].mean()]), values.iloc[period + 1:]])
+        averages.append(seeded.ewm(alpha=1 / period, adjust=False).mean().to_numpy())
+    avg_gain, avg_loss = averages
+    with np.errstate(divide='ignore', invalid='ignore'):
+        rsi.iloc[period:] = 100 - 100 / (1 + avg_gain / avg_loss)
+    return rsi.to_numpy()
+
+
+@pytest.mark.parametrize("span", [2, 9, 12, 26])
+def test_ema_matches_pandas_ewm(span):
+    values = _random_walk(300, seed=span)
+    values[[0, 5, 6, 100]] = np.nan  # leading and interior gaps
+    expected = pd.Series(values).ewm(span=span).mean().to_numpy()
+    np.testing.assert_allclose(ema(values, span), expected, rtol=RTOL)
+
+
+@pytest.mark.parametrize("period", [2, 14, 30])
+def test_rsi_wilder_matches_pandas(period):
+    close = _random_walk(400, seed=period)
+    np.testing.assert_allclose(rsi_wilder(close, period), _pandas_rsi(close, period), rtol=RTOL)
+
+
+def test_rsi_wilder_short_and_flat_input():
+    assert np.isnan(rsi_wilder(np.arange(14.0), 14)).all()
+    assert np.isnan(rsi_wilder(np.full(30, 5.0), 14)).all()
+    assert rsi_wilder(np.arange(30.0), 14)[-1] == 100.0
+
+
+@pytest.mark.skipif(TALIB_AVAILABLE, reason="per-indicator methods delegate to TA-Lib")
+@pytest.mark.parametrize("n", [10, 30, 60, 250])
+def test_latest_indicators_match_per_indicator_methods(n):
+    close = _random_walk(n, seed=n)
+    analyzer = TechnicalAnalyzer()
+    moving_averages = analyzer.calculate_moving_averages(close)
+    bollinger_bands = analyzer.calculate_bollinger_bands(close)
+    macd = analyzer.calculate_macd(close)
+    expected = (
+        analyzer.calculate_rsi(close)[-1], moving_averages['MA_20'][-1], moving_averages['MA_50'][-1],
+        moving_averages['MA_200'][-1], bollinger_bands['BB_Upper'][-1], bollinger_bands['BB_Lower'][-1],
+        macd['MACD'][-1], macd['Signal'][-1],
+    )
+    np.testing.assert_allclose(latest_indicators(close), expected, rtol=RTOL)
+
+
+def _reference_backtest(close, params, initial_capital):
+    """The bar-by-bar Python loop the njit backtest kernel replaced."""
+    series = pd.Series(close)
+    rsi = _pandas_rsi(close, params['rsi_period'])
+    ma_s = series.rolling(window=params['ma_short']).mean().to_numpy()
+    ma_l = series.rolling(window=params['ma_long']).mean().to_numpy()
+    ready = ~(np.isnan(rsi) | np.isnan(ma_s) | np.isnan(ma_l))
+    signals = np.where((rsi < params['rsi_oversold']) & (ma_s > ma_l), 1,
+                       np.where((rsi > params['rsi_overbought']) | (ma_s < ma_l), -1, 0))
+
+    capital, shares, entry_price = initial_capital, 0, 0.0
+    trades, equity_curve = [], []
+    for i, current_price in enumerate(close.tolist()):
+        if ready[i]:
+            if signals[i] == 1 and shares == 0:
+                shares = capital // current_price
+                capital -= shares * current_price
+                entry_price = current_price
+                trades.append((i, 'BUY', current_price, shares, capital))
+            elif signals[i] == -1 and shares > 0:
+                capital += shares * current_price
+                trades.append((i, 'SELL', current_price, shares, capital))
+                shares = 0
+
+            if shares > 0:
+                price_change = (current_price - entry_price) / entry_price
+                if price_change <= -params['stop_loss']:
+                    capital += shares * current_price
+                    trades.append((i, 'STOP_LOSS', current_price, shares, capital))
+                    shares = 0
+                elif price_change >= params['take_profit']:
+                    capital += shares * current_price
+                    trades.append((i, 'TAKE_PROFIT', current_price, shares, capital))
+                    shares = 0
+
+        equity_curve.append(capital + shares * current_price)
+
+    if shares > 0:
+        capital += shares * close[-1]
+        trades.append((len(close) - 1, 'CLOSE', close[-1], shares, capital))
+    return equity_curve, trades
+
+
+def test_backtest_matches_reference_loop():
+    close = _random_walk(500, seed=42)
+    hist = pd.DataFrame({'Close': close}, index=pd.bdate_range('2022-01-03', periods=len(close)))
+    params = {'rsi_period': 10, 'rsi_oversold': 60, 'rsi_overbought': 70,
+              'ma_short': 5, 'ma_long': 20, 'stop_loss': 0.015, 'take_profit': 0.03}
+
+    result = Backtester(10000).backtest_strategy('TEST', params, hist=hist)
+    equity_curve, trades = _reference_backtest(close, params, 10000)
+
+    # The seed and thresholds are picked so that every kind of exit is exercised
+    assert {'SELL', 'STOP_LOSS', 'TAKE_PROFIT'} <= {action for _, action, *_ in trades}
+    np.testing.assert_allclose(result['equity_curve'], equity_curve, rtol=1e-12)
+    assert [(hist.index.get_loc(t['date']), t['action']) for t in result['trades']] == \
+        [(i, action) for i, action, *_ in trades]
+    np.testing.assert_allclose(
+        [(t['price'], t['shares'], t['capital']) for t in result['trades']],
+        [values for _, _, *values in trades], rtol=1e-12
+    )
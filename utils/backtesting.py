@@ -3,6 +3,10 @@ import numpy as np
 import yfinance as yf
 from typing import Dict, List, Tuple, Optional
 from datetime import datetime, timedelta
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from dataclasses import dataclass
+import time
 try:
     import matplotlib
     matplotlib.use('Agg')  # Use non-interactive backend for cloud
@@ -12,6 +16,199 @@ try:
 except ImportError:
     PLOTTING_AVAILABLE = False
     # Silent fallback for cloud deployment
+from utils.indicator_kernels import njit, rsi_wilder, NUMBA_AVAILABLE
+from data_sources.stock_prices import bulk_history
+
+HISTORY_TTL_SECONDS = 3600
+
+DEFAULT_STRATEGY_PARAMS = {
+    'rsi_period': 14,
+    'rsi_oversold': 30,
+    'rsi_overbought': 70,
+    'ma_short': 20,
+    'ma_long': 50,
+    'stop_loss': 0.05,
+    'take_profit': 0.10,
+}
+
+# Columns of compare_strategies' table (numeric), and how to display them: table.style.format(STRATEGY_TABLE_FORMATS)
+STRATEGY_TABLE_COLUMNS = ['Strategy', 'Total Return', 'Sharpe Ratio', 'Max Drawdown', 'Win Rate', 'Total Trades']
+STRATEGY_TABLE_FORMATS = {
+    'Total Return': '{:.2%}',
+    'Sharpe Ratio': '{:.2f}',
+    'Max Drawdown': '{:.2%}',
+    'Win Rate': '{:.2%}',
+}
+
+# Trade action codes written by _run_backtest, and the names reported for them
+BUY, SELL, STOP_LOSS, TAKE_PROFIT, CLOSE = range(5)
+TRADE_ACTIONS = ('BUY', 'SELL', 'STOP_LOSS', 'TAKE_PROFIT', 'CLOSE')
+
+
+@dataclass
+class TradeLog:
+    """Trades stored as parallel arrays, one entry per trade."""
+    dates: pd.Index
+    actions: np.ndarray  # TRADE_ACTIONS codes
+    prices: np.ndarray
+    shares: np.ndarray
+    capitals: np.ndarray
+    
+    def __len__(self) -> int:
+        return len(self.actions)
+    
+    def to_records(self) -> List[Dict]:
+        """Trades as a list of dicts: [{date, action, price, shares, capital}]."""
+        return [
+            {'date': date, 'action': TRADE_ACTIONS[action], 'price': price, 'shares': shares, 'capital': capital}
+            for date, action, price, shares, capital in zip(
+                self.dates, self.actions.tolist(), self.prices.tolist(),
+                self.shares.tolist(), self.capitals.tolist()
+            )
+        ]
+    
+    def to_frame(self) -> pd.DataFrame:
+        return pd.DataFrame(self.to_records(), columns=['date', 'action', 'price', 'shares', 'capital'])
+
+
+@njit(cache=True, nogil=True)
+def _run_backtest(close, ready, signals, initial_capital, stop_loss, take_profit):
+    """
+    Bar-by-bar simulation of one long-only position with stop loss / take profit.
+    
+    Returns the equity curve, the filled part of the trade buffers and running return stats:
+    (equity, trade_index, trade_action, trade_price, trade_shares, trade_capital,
+     (n_returns, mean_return, m2, max_drawdown))
+    
+    Return mean/variance (Welford's m2) and max drawdown are accumulated bar by bar,
+    so metrics don't need another pass over the equity curve.
+    """
+    n = len(close)
+    equity = np.empty(n)
+    # At most two trades per bar (a buy stopped out immediately) plus the final close
+    size = 2 * n + 1
+    trade_index = np.empty(size, dtype=np.int64)
+    trade_action = np.empty(size, dtype=np.uint8)
+    trade_price = np.empty(size)
+    trade_shares = np.empty(size)
+    trade_capital = np.empty(size)
+    n_trades = 0
+    
+    capital = initial_capital
+    shares = 0.0
+    entry_price = 0.0
+    n_returns = 0
+    mean_return = 0.0
+    m2 = 0.0
+    peak = 0.0
+    max_drawdown = np.nan
+    for i in range(n):
+        current_price = close[i]
+        
+        # Bars without all indicators available are skipped
+        if ready[i]:
+            action = -1
+            
+            # Execute trades
+            if signals[i] == 1 and shares == 0:
+                shares = capital // current_price
+                capital -= shares * current_price
+                entry_price = current_price
+                action = BUY
+            elif signals[i] == -1 and shares > 0:
+                capital += shares * current_price
+                action = SELL
+            
+            if action >= 0:
+                trade_index[n_trades] = i
+                trade_action[n_trades] = action
+                trade_price[n_trades] = current_price
+                trade_shares[n_trades] = shares
+                trade_capital[n_trades] = capital
+                n_trades += 1
+                if action == SELL:
+                    shares = 0.0
+            
+            # Check stop loss and take profit
+            if shares > 0:
+                price_change = (current_price - entry_price) / entry_price
+                action = -1
+                if price_change <= -stop_loss:
+                    action = STOP_LOSS
+                elif price_change >= take_profit:
+                    action = TAKE_PROFIT
+                
+                if action >= 0:
+                    capital += shares * current_price
+                    trade_index[n_trades] = i
+                    trade_action[n_trades] = action
+                    trade_price[n_trades] = current_price
+                    trade_shares[n_trades] = shares
+                    trade_capital[n_trades] = capital
+                    n_trades += 1
+                    shares = 0.0
+        
+        # Record equity
+        equity[i] = capital + shares * current_price
+        
+        # Daily return stats; drawdown is measured from the first bar that has a return
+        if i > 0 and equity[i - 1] != 0:
+            daily_return = (equity[i] - equity[i - 1]) / equity[i - 1]
+            n_returns += 1
+            delta = daily_return - mean_return
+            mean_return += delta / n_returns
+            m2 += delta * (daily_return - mean_return)
+            
+            if n_returns == 1:
+                peak = equity[i]
+                max_drawdown = 0.0
+            elif equity[i] > peak:
+                peak = equity[i]
+            else:
+                max_drawdown = min(max_drawdown, (equity[i] - peak) / peak)
+    
+    # Close any remaining position
+    if shares > 0:
+        capital += shares * close[n - 1]
+        trade_index[n_trades] = n - 1
+        trade_action[n_trades] = CLOSE
+        trade_price[n_trades] = close[n - 1]
+        trade_shares[n_trades] = shares
+        trade_capital[n_trades] = capital
+        n_trades += 1
+    
+    return (equity, trade_index[:n_trades], trade_action[:n_trades], trade_price[:n_trades],
+            trade_shares[:n_trades], trade_capital[:n_trades], (n_returns, mean_return, m2, max_drawdown))
+
+
+@lru_cache(maxsize=256)
+def _cached_history(ticker: str, start_date: Optional[str], end_date: Optional[str], time_bucket: int) -> pd.DataFrame:
+    # time_bucket only keys the cache, so each history is downloaded at most once per TTL window
+    stock = yf.Ticker(ticker)
+    
+    if start_date and end_date:
+        hist = stock.history(start=start_date, end=end_date)
+    else:
+        hist = stock.history(period="2y")  # Default to 2 years
+    
+    if hist.empty:
+        raise LookupError(ticker)  # lru_cache doesn't store exceptions, so empty results are retried
+    return hist
+
+
+def _rolling_means(close: np.ndarray, windows: List[int]) -> List[np.ndarray]:
+    """
+    Simple moving averages for every window from one cumulative sum of the closes, NaN until each window fills.
+    """
+    cumsum = np.concatenate(([0.0], np.cumsum(close)))
+    averages = []
+    for window in windows:
+        sma = np.full(len(close), np.nan)
+        if window <= len(close):
+            sma[window - 1:] = (cumsum[window:] - cumsum[:-window]) / window
+        averages.append(sma)
+    return averages
+
 
 class Backtester:
     """
@@ -23,7 +220,9 @@ class Backtester:
         self.results = {}
     
     def backtest_strategy(self, ticker: str, strategy_params: Dict, 
-                         start_date: str = None, end_date: str = None) -> Dict[str, any]:
+                         start_date: str = None, end_date: str = None,
+                         hist: Optional[pd.DataFrame] = None,
+                         indicator_cache: Optional[Dict] = None) -> Dict[str, any]:
         """
         Backtest a trading strategy on historical data.
         
@@ -32,199 +231,115 @@ class Backtester:
             strategy_params: Strategy parameters
             start_date: Start date for backtest
             end_date: End date for backtest
+            hist: Optional price history to use instead of downloading it (left unmodified)
+            indicator_cache: Optional dict shared between runs on the same history to reuse indicators
         
         Returns:
             Dict with backtest results and performance metrics
         """
-        # Fetch historical data
-        stock = yf.Ticker(ticker)
-        
-        if start_date and end_date:
-            hist = stock.history(start=start_date, end=end_date)
-        else:
-            hist = stock.history(period="2y")  # Default to 2 years
+        if hist is None:
+            hist = self._fetch_history(ticker, start_date, end_date)
         
         if hist.empty:
             return {"error": f"Could not fetch data for {ticker}"}
         
-        # Initialize backtest variables
-        capital = self.initial_capital
-        shares = 0
-        trades = []
-        equity_curve = []
-        
         # Strategy parameters
-        rsi_period = strategy_params.get('rsi_period', 14)
-        rsi_oversold = strategy_params.get('rsi_oversold', 30)
-        rsi_overbought = strategy_params.get('rsi_overbought', 70)
-        ma_short = strategy_params.get('ma_short', 20)
-        ma_long = strategy_params.get('ma_long', 50)
-        stop_loss = strategy_params.get('stop_loss', 0.05)
-        take_profit = strategy_params.get('take_profit', 0.10)
-        
-        # Calculate indicators
-        hist['RSI'] = self._calculate_rsi(hist['Close'], rsi_period)
-        hist['MA_Short'] = hist['Close'].rolling(window=ma_short).mean()
-        hist['MA_Long'] = hist['Close'].rolling(window=ma_long).mean()
-        
-        # Run backtest
-        for i in range(len(hist)):
-            current_price = hist['Close'].iloc[i]
-            current_rsi = hist['RSI'].iloc[i]
-            current_ma_short = hist['MA_Short'].iloc[i]
-            current_ma_long = hist['MA_Long'].iloc[i]
-            
-            # Skip if indicators are not available
-            if pd.isna(current_rsi) or pd.isna(current_ma_short) or pd.isna(current_ma_long):
-                equity_curve.append(capital + (shares * current_price))
-                continue
-            
-            # Generate signals
-            signal = self._generate_signal(current_rsi, current_ma_short, current_ma_long, 
-                                        rsi_oversold, rsi_overbought)
-            
-            # Execute trades
-            if signal == 'BUY' and shares == 0:
-                # Buy signal
-                shares = capital // current_price
-                capital -= shares * current_price
-                entry_price = current_price
-                trades.append({
-                    'date': hist.index[i],
-                    'action': 'BUY',
-                    'price': current_price,
-                    'shares': shares,
-                    'capital': capital
-                })
-            
-            elif signal == 'SELL' and shares > 0:
-                # Sell signal
-                capital += shares * current_price
-                trades.append({
-                    'date': hist.index[i],
-                    'action': 'SELL',
-                    'price': current_price,
-                    'shares': shares,
-                    'capital': capital
-                })
-                shares = 0
-            
-            # Check stop loss and take profit
-            if shares > 0:
-                price_change = (current_price - entry_price) / entry_price
-                
-                if price_change <= -stop_loss:  # Stop loss hit
-                    capital += shares * current_price
-                    trades.append({
-                        'date': hist.index[i],
-                        'action': 'STOP_LOSS',
-                        'price': current_price,
-                        'shares': shares,
-                        'capital': capital
-                    })
-                    shares = 0
-                
-                elif price_change >= take_profit:  # Take profit hit
-                    capital += shares * current_price
-                    trades.append({
-                        'date': hist.index[i],
-                        'action': 'TAKE_PROFIT',
-                        'price': current_price,
-                        'shares': shares,
-                        'capital': capital
-                    })
-                    shares = 0
-            
-            # Record equity
-            equity_curve.append(capital + (shares * current_price))
-        
-        # Close any remaining position
-        if shares > 0:
-            final_price = hist['Close'].iloc[-1]
-            capital += shares * final_price
-            trades.append({
-                'date': hist.index[-1],
-                'action': 'CLOSE',
-                'price': final_price,
-                'shares': shares,
-                'capital': capital
-            })
+        params = {**DEFAULT_STRATEGY_PARAMS, **strategy_params}
+        rsi_oversold = params['rsi_oversold']
+        rsi_overbought = params['rsi_overbought']
+        stop_loss = params['stop_loss']
+        take_profit = params['take_profit']
+        
+        # Calculate indicators as arrays (the frame itself is never modified)
+        close = hist['Close'].to_numpy(dtype=np.float64)
+        rsi, ma_s, ma_l = self._indicators(
+            close, params['rsi_period'], params['ma_short'], params['ma_long'], indicator_cache
+        )
+        
+        ready = ~(np.isnan(rsi) | np.isnan(ma_s) | np.isnan(ma_l))
+        
+        # Signals as int8 (1 = BUY, -1 = SELL, 0 = HOLD); BUY wins when both conditions hold
+        buy = (rsi < rsi_oversold) & (ma_s > ma_l)
+        sell = (rsi > rsi_overbought) | (ma_s < ma_l)
+        signals = buy.astype(np.int8) - (sell & ~buy).astype(np.int8)
+        
+        # Run backtest (plain lists iterate faster than arrays when numba isn't compiling the loop)
+        args = (close, ready, signals) if NUMBA_AVAILABLE else (close.tolist(), ready.tolist(), signals.tolist())
+        equity, trade_index, trade_action, trade_price, trade_shares, trade_capital, return_stats = _run_backtest(
+            *args, float(self.initial_capital), float(stop_loss), float(take_profit)
+        )
+        equity_curve = equity.tolist()
+        
+        trade_log = TradeLog(hist.index[trade_index], trade_action, trade_price, trade_shares, trade_capital)
         
         # Calculate performance metrics
         final_capital = equity_curve[-1]
-        performance_metrics = self._calculate_performance_metrics(equity_curve, trades, hist)
+        performance_metrics = self._calculate_performance_metrics(equity_curve, trade_log, hist, return_stats)
         
         return {
             'ticker': ticker,
             'initial_capital': self.initial_capital,
             'final_capital': final_capital,
             'total_return': (final_capital - self.initial_capital) / self.initial_capital,
-            'trades': trades,
+            'trades': trade_log.to_records(),  # Trades only become dicts here, at the API boundary
             'equity_curve': equity_curve,
             'performance_metrics': performance_metrics,
             'strategy_params': strategy_params
         }
     
-    def _calculate_rsi(self, prices: pd.Series, period: int = 14) -> pd.Series:
-        """Calculate RSI indicator."""
-        delta = prices.diff()
-        gain = (delta.where(delta > 0, 0)).rolling(window=period).mean()
-        loss = (-delta.where(delta < 0, 0)).rolling(window=period).mean()
-        rs = gain / loss
-        rsi = 100 - (100 / (1 + rs))
-        return rsi
+    def _fetch_history(self, ticker: str, start_date: str = None, end_date: str = None) -> pd.DataFrame:
+        """Fetch historical data, cached for HISTORY_TTL_SECONDS (treat the result as read-only)."""
+        if not (start_date and end_date):
+            start_date = end_date = None
+        try:
+            return _cached_history(ticker, start_date, end_date, int(time.time() // HISTORY_TTL_SECONDS))
+        except LookupError:
+            return pd.DataFrame()
     
-    def _generate_signal(self, rsi: float, ma_short: float, ma_long: float,
-                        rsi_oversold: float, rsi_overbought: float) -> str:
-        """Generate trading signal based on indicators."""
-        # RSI signals
-        rsi_buy = rsi < rsi_oversold
-        rsi_sell = rsi > rsi_overbought
-        
-        # Moving average signals
-        ma_buy = ma_short > ma_long
-        ma_sell = ma_short < ma_long
-        
-        # Combined signal
-        if rsi_buy and ma_buy:
-            return 'BUY'
-        elif rsi_sell or ma_sell:
-            return 'SELL'
-        else:
-            return 'HOLD'
+    def _indicators(self, close: np.ndarray, rsi_period: int, ma_short: int, ma_long: int,
+                    cache: Optional[Dict] = None) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        RSI (Wilder's smoothing) and both moving averages, reusing any already in `cache`.
+        They are computed in float64 but stored as float32: they only feed signal comparisons,
+        and halving them keeps a strategy sweep's shared indicator set small.
+        """
+        if cache is None:
+            cache = {}
+        
+        if ('rsi', rsi_period) not in cache:
+            cache[('rsi', rsi_period)] = rsi_wilder(close, rsi_period).astype(np.float32)
+        
+        missing = [w for w in dict.fromkeys((ma_short, ma_long)) if ('sma', w) not in cache]
+        for window, sma in zip(missing, _rolling_means(close, missing)):
+            cache[('sma', window)] = sma.astype(np.float32)
+        
+        return cache[('rsi', rsi_period)], cache[('sma', ma_short)], cache[('sma', ma_long)]
     
     def _calculate_performance_metrics(self, equity_curve: List[float], 
-                                     trades: List[Dict], hist: pd.DataFrame) -> Dict[str, float]:
-        """Calculate comprehensive performance metrics."""
-        equity_series = pd.Series(equity_curve)
+                                     trades: TradeLog, hist: pd.DataFrame,
+                                     return_stats: Tuple[int, float, float, float]) -> Dict[str, float]:
+        """Calculate comprehensive performance metrics from the kernel's running return stats."""
+        equity = np.asarray(equity_curve, dtype=np.float64)
         
         # Basic metrics
-        total_return = (equity_series.iloc[-1] - equity_series.iloc[0]) / equity_series.iloc[0]
-        
-        # Calculate daily returns
-        daily_returns = equity_series.pct_change().dropna()
+        total_return = (equity[-1] - equity[0]) / equity[0]
         
         # Risk metrics
-        volatility = daily_returns.std() * np.sqrt(252)  # Annualized
-        sharpe_ratio = (daily_returns.mean() * 252) / volatility if volatility > 0 else 0
-        
-        # Maximum drawdown
-        cumulative_returns = (1 + daily_returns).cumprod()
-        running_max = cumulative_returns.expanding().max()
-        drawdown = (cumulative_returns - running_max) / running_max
-        max_drawdown = drawdown.min()
+        n_returns, mean_return, m2, max_drawdown = return_stats
+        volatility = np.sqrt(m2 / (n_returns - 1)) * np.sqrt(252) if n_returns > 1 else np.nan  # Annualized
+        sharpe_ratio = (mean_return * 252) / volatility if volatility > 0 else 0
         
         # Trade analysis
-        if trades:
-            winning_trades = [t for t in trades if t['action'] in ['SELL', 'TAKE_PROFIT']]
-            losing_trades = [t for t in trades if t['action'] == 'STOP_LOSS']
+        if len(trades):
+            winning = (trades.actions == SELL) | (trades.actions == TAKE_PROFIT)
+            losing = trades.actions == STOP_LOSS
             
-            win_rate = len(winning_trades) / len(trades) if trades else 0
+            win_rate = np.count_nonzero(winning) / len(trades)
             
             # Calculate average win/loss
-            if winning_trades and losing_trades:
-                avg_win = np.mean([t['price'] for t in winning_trades])
-                avg_loss = np.mean([t['price'] for t in losing_trades])
+            if winning.any() and losing.any():
+                avg_win = trades.prices[winning].mean()
+                avg_loss = trades.prices[losing].mean()
                 profit_factor = avg_win / avg_loss if avg_loss > 0 else float('inf')
             else:
                 profit_factor = 0
@@ -238,7 +353,7 @@ class Backtester:
         
         return {
             'total_return': total_return,
-            'annualized_return': total_return * (252 / len(equity_series)),
+            'annualized_return': total_return * (252 / len(equity)),
             'volatility': volatility,
             'sharpe_ratio': sharpe_ratio,
             'max_drawdown': max_drawdown,
@@ -261,11 +376,29 @@ class Backtester:
             Dict with comparison results
         """
         results = {}
+        if not strategies:
+            return {'comparison_table': pd.DataFrame(columns=STRATEGY_TABLE_COLUMNS), 'detailed_results': results}
         
-        for strategy_name, strategy_params in strategies.items():
-            result = self.backtest_strategy(ticker, strategy_params)
-            if 'error' not in result:
-                results[strategy_name] = result
+        # Download the history once and compute each distinct indicator once up front,
+        # so the independent strategies only read shared arrays while they run in parallel
+        hist = self._fetch_history(ticker)
+        indicator_cache = {}
+        if not hist.empty:
+            close = hist['Close'].to_numpy(dtype=np.float64)
+            for strategy_params in strategies.values():
+                params = {**DEFAULT_STRATEGY_PARAMS, **strategy_params}
+                self._indicators(close, params['rsi_period'], params['ma_short'], params['ma_long'], indicator_cache)
+        
+        with ThreadPoolExecutor(max_workers=min(8, len(strategies))) as executor:
+            backtests = executor.map(
+                lambda strategy_params: self.backtest_strategy(
+                    ticker, strategy_params, hist=hist, indicator_cache=indicator_cache
+                ),
+                strategies.values()
+            )
+            for strategy_name, result in zip(strategies, backtests):
+                if 'error' not in result:
+                    results[strategy_name] = result
         
         # Create comparison table
         comparison_data = []
@@ -273,18 +406,39 @@ class Backtester:
             metrics = result['performance_metrics']
             comparison_data.append({
                 'Strategy': strategy_name,
-                'Total Return': f"{metrics['total_return']:.2%}",
-                'Sharpe Ratio': f"{metrics['sharpe_ratio']:.2f}",
-                'Max Drawdown': f"{metrics['max_drawdown']:.2%}",
-                'Win Rate': f"{metrics['win_rate']:.2%}",
+                'Total Return': metrics['total_return'],
+                'Sharpe Ratio': metrics['sharpe_ratio'],
+                'Max Drawdown': metrics['max_drawdown'],
+                'Win Rate': metrics['win_rate'],
                 'Total Trades': metrics['total_trades']
             })
         
         return {
-            'comparison_table': pd.DataFrame(comparison_data),
+            'comparison_table': pd.DataFrame(comparison_data, columns=STRATEGY_TABLE_COLUMNS),
             'detailed_results': results
         }
     
+    def backtest_tickers(self, tickers: List[str], strategy_params: Dict,
+                         start_date: str = None, end_date: str = None) -> Dict[str, Dict]:
+        """
+        Backtest one strategy across several tickers, downloading all histories in a single batch.
+        
+        Returns:
+            Dict of backtest results: {ticker: result}
+        """
+        tickers = list(dict.fromkeys(tickers))
+        if not tickers:
+            return {}
+        
+        if start_date and end_date:
+            histories = bulk_history(tickers, start=start_date, end=end_date)
+        else:
+            histories = bulk_history(tickers, period="2y")
+        return {
+            ticker: self.backtest_strategy(ticker, strategy_params, hist=histories[ticker])
+            for ticker in tickers
+        }
+    
     def generate_performance_report(self, backtest_result: Dict) -> str:
         """Generate a human-readable performance report."""
         if 'error' in backtest_result:
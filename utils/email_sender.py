@@ -1,4 +1,5 @@
 import smtplib
+import mmap
 import os
 from dotenv import load_dotenv
 from email.mime.multipart import MIMEMultipart
@@ -7,21 +8,90 @@ from email.mime.application import MIMEApplication
 
 load_dotenv()
 
-def send_email_with_attachment(to_email, subject, message, file_path):
-    smtp_server = os.getenv("SMTP_SERVER")
-    smtp_port = int(os.getenv("SMTP_PORT", 587))
-    smtp_username = os.getenv("SMTP_USERNAME")
-    smtp_password = os.getenv("SMTP_PASSWORD")
-    from_email = os.getenv("EMAIL_FROM_ADDRESS")
 
-    if not all([smtp_server, smtp_port, smtp_username, smtp_password, from_email]):
-        print("❌ Missing SMTP configuration in .env")
-        return False
+class EmailSender:
+    """
+    SMTP connection that is opened and authenticated once, then reused for every message.
 
-    try:
+    Usage:
+        with EmailSender() as sender:
+            for to_email in recipients:
+                sender.send(to_email, subject, message, file_path)
+    """
+
+    def __init__(self):
+        self.smtp_server = os.getenv("SMTP_SERVER")
+        self.smtp_port = int(os.getenv("SMTP_PORT", 587))
+        self.smtp_username = os.getenv("SMTP_USERNAME")
+        self.smtp_password = os.getenv("SMTP_PASSWORD")
+        self.from_email = os.getenv("EMAIL_FROM_ADDRESS")
+        self.server = None
+        self._fresh = False
+        self._attachments = {}  # file_path -> MIME part, so a report sent to many recipients is read once
+
+    @property
+    def configured(self):
+        return all([self.smtp_server, self.smtp_port, self.smtp_username, self.smtp_password, self.from_email])
+
+    def __enter__(self):
+        self.connect()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def connect(self):
+        server = smtplib.SMTP(self.smtp_server, self.smtp_port)
+        try:
+            server.starttls()
+            server.login(self.smtp_username, self.smtp_password)
+        except BaseException:
+            server.close()  # don't leak the socket when the handshake or login fails
+            raise
+        self.server = server
+        self._fresh = True  # just authenticated, so the first send can skip the NOOP
+
+    def close(self):
+        if self.server is not None:
+            try:
+                self.server.quit()
+            except (smtplib.SMTPException, OSError):
+                self.server.close()
+            self.server = None
+
+    def _ensure_connected(self):
+        # Reconnect if the server dropped an idle connection between sends
+        if self.server is not None:
+            if self._fresh:
+                self._fresh = False
+                return
+            try:
+                if self.server.noop()[0] == 250:
+                    return
+            except (smtplib.SMTPException, OSError):
+                pass
+            self.close()
+        self.connect()
+        self._fresh = False
+
+    def _attachment(self, file_path):
+        part = self._attachments.get(file_path)
+        if part is None:
+            with open(file_path, "rb") as f:
+                if os.fstat(f.fileno()).st_size:
+                    # Base64-encode straight from the mapped file instead of reading a copy into memory first
+                    with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                        part = MIMEApplication(mm, Name=os.path.basename(file_path))
+                else:
+                    part = MIMEApplication(b"", Name=os.path.basename(file_path))  # empty files can't be mapped
+            part["Content-Disposition"] = f'attachment; filename="{os.path.basename(file_path)}"'
+            self._attachments[file_path] = part
+        return part
+
+    def send(self, to_email, subject, message, file_path):
         # Create email
         msg = MIMEMultipart()
-        msg["From"] = from_email
+        msg["From"] = self.from_email
         msg["To"] = to_email
         msg["Subject"] = subject
 
@@ -29,20 +99,27 @@ def send_email_with_attachment(to_email, subject, message, file_path):
         msg.attach(MIMEText(message, "plain"))
 
         # Attachment
-        with open(file_path, "rb") as f:
-            part = MIMEApplication(f.read(), Name=os.path.basename(file_path))
-            part["Content-Disposition"] = f'attachment; filename="{os.path.basename(file_path)}"'
-            msg.attach(part)
+        msg.attach(self._attachment(file_path))
 
         # Send email
-        with smtplib.SMTP(smtp_server, smtp_port) as server:
-            server.starttls()
-            server.login(smtp_username, smtp_password)
-            server.send_message(msg)
+        self._ensure_connected()
+        self.server.send_message(msg)
+
+
+def send_email_with_attachment(to_email, subject, message, file_path):
+    sender = EmailSender()
+
+    if not sender.configured:
+        print("❌ Missing SMTP configuration in .env")
+        return False
+
+    try:
+        with sender:
+            sender.send(to_email, subject, message, file_path)
 
         print("✅ Email sent via Elastic Email SMTP")
         return True
 
     except Exception as e:
         print(f"❌ Failed to send email: {e}")
-        return False
\ No newline at end of file
+        return False
@@ -4,6 +4,90 @@ import yfinance as yf
 from typing import Dict, List, Optional
 import requests
 from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from data_sources.stock_prices import get_ticker
+
+# Columns of compare_fundamentals' table (numeric), and how to display them: table.style.format(FUNDAMENTALS_TABLE_FORMATS)
+FUNDAMENTALS_TABLE_COLUMNS = ['Ticker', 'Score', 'Rating', 'Recommendation', 'P/E Ratio', 'ROE', 'Debt/Equity']
+FUNDAMENTALS_TABLE_FORMATS = {
+    'Score': '{:.1f}%',
+    'ROE': '{:.2%}',
+    'Debt/Equity': '{:.2f}',
+}
+
+@lru_cache(maxsize=4096)
+def _fundamental_score(pe_ratio: float, debt_to_equity: float, roe: float, revenue_growth: float) -> int:
+    """Points out of 100 for valuation, financial health, profitability and growth (25 each)."""
+    score = 0
+
+    # Valuation score (25 points)
+    if 0 < pe_ratio < 15:
+        score += 25
+    elif 0 < pe_ratio < 25:
+        score += 15
+    elif 0 < pe_ratio < 35:
+        score += 5
+
+    # Financial health score (25 points)
+    if debt_to_equity < 0.3:
+        score += 25
+    elif debt_to_equity < 0.5:
+        score += 15
+    elif debt_to_equity < 0.7:
+        score += 5
+
+    # Profitability score (25 points)
+    if roe > 0.15:
+        score += 25
+    elif roe > 0.10:
+        score += 15
+    elif roe > 0.05:
+        score += 5
+
+    # Growth score (25 points)
+    if revenue_growth > 0.15:
+        score += 25
+    elif revenue_growth > 0.10:
+        score += 15
+    elif revenue_growth > 0.05:
+        score += 5
+    
+    return score
+
+@lru_cache(maxsize=4096)
+def _quality_score(roe: float, roa: float, gross_margin: float, operating_margin: float) -> int:
+    """Quality score (0-100) based on profitability."""
+    quality_score = 0
+    if roe > 0.15:
+        quality_score += 25
+    elif roe > 0.10:
+        quality_score += 15
+    elif roe > 0.05:
+        quality_score += 5
+
+    if roa > 0.10:
+        quality_score += 25
+    elif roa > 0.05:
+        quality_score += 15
+    elif roa > 0.02:
+        quality_score += 5
+
+    if gross_margin > 0.40:
+        quality_score += 25
+    elif gross_margin > 0.20:
+        quality_score += 15
+    elif gross_margin > 0.10:
+        quality_score += 5
+
+    if operating_margin > 0.20:
+        quality_score += 25
+    elif operating_margin > 0.10:
+        quality_score += 15
+    elif operating_margin > 0.05:
+        quality_score += 5
+    
+    return quality_score
 
 class FundamentalAnalyzer:
     """
@@ -25,7 +109,8 @@ class FundamentalAnalyzer:
             Dict with fundamental analysis results
         """
         try:
-            stock = yf.Ticker(ticker)
+            # Shared Ticker, so .info and the statements are reused for a few minutes
+            stock = get_ticker(ticker)
             info = stock.info
             
             # Basic company info
@@ -112,13 +197,14 @@ class FundamentalAnalyzer:
             if cash_flow is None or cash_flow.empty:
                 return {"error": "No cash flow data available"}
             
-            # Calculate key cash flow metrics
-            operating_cf = cash_flow.loc['Operating Cash Flow'].iloc[0] if 'Operating Cash Flow' in cash_flow.index else 0
-            investing_cf = cash_flow.loc['Investing Cash Flow'].iloc[0] if 'Investing Cash Flow' in cash_flow.index else 0
-            financing_cf = cash_flow.loc['Financing Cash Flow'].iloc[0] if 'Financing Cash Flow' in cash_flow.index else 0
+            # Calculate key cash flow metrics from the latest period, as plain dict lookups
+            latest = cash_flow.iloc[:, 0].to_dict().get
+            operating_cf = latest('Operating Cash Flow', 0)
+            investing_cf = latest('Investing Cash Flow', 0)
+            financing_cf = latest('Financing Cash Flow', 0)
             
             # Free cash flow calculation
-            capex = cash_flow.loc['Capital Expenditure'].iloc[0] if 'Capital Expenditure' in cash_flow.index else 0
+            capex = latest('Capital Expenditure', 0)
             free_cash_flow = operating_cf + capex  # Capex is typically negative
             
             return {
@@ -168,10 +254,14 @@ class FundamentalAnalyzer:
             
             # Calculate growth rates
             if len(earnings) >= 2:
-                revenue_growth = ((earnings['Revenue'].iloc[-1] - earnings['Revenue'].iloc[-2]) / 
-                                earnings['Revenue'].iloc[-2]) if 'Revenue' in earnings.columns else 0
-                eps_growth = ((earnings['Earnings'].iloc[-1] - earnings['Earnings'].iloc[-2]) / 
-                             earnings['Earnings'].iloc[-2]) if 'Earnings' in earnings.columns else 0
+                def growth(column):
+                    if column not in earnings.columns:
+                        return 0
+                    previous, last = earnings[column].to_numpy()[-2:]
+                    return (last - previous) / previous
+                
+                revenue_growth = growth('Revenue')
+                eps_growth = growth('Earnings')
             else:
                 revenue_growth = 0
                 eps_growth = 0
@@ -193,34 +283,7 @@ class FundamentalAnalyzer:
         operating_margin = info.get('operatingMargins', 0)
         
         # Quality score based on profitability
-        quality_score = 0
-        if roe > 0.15:
-            quality_score += 25
-        elif roe > 0.10:
-            quality_score += 15
-        elif roe > 0.05:
-            quality_score += 5
-        
-        if roa > 0.10:
-            quality_score += 25
-        elif roa > 0.05:
-            quality_score += 15
-        elif roa > 0.02:
-            quality_score += 5
-        
-        if gross_margin > 0.40:
-            quality_score += 25
-        elif gross_margin > 0.20:
-            quality_score += 15
-        elif gross_margin > 0.10:
-            quality_score += 5
-        
-        if operating_margin > 0.20:
-            quality_score += 25
-        elif operating_margin > 0.10:
-            quality_score += 15
-        elif operating_margin > 0.05:
-            quality_score += 5
+        quality_score = _quality_score(roe, roa, gross_margin, operating_margin)
         
         quality_rating = 'HIGH' if quality_score >= 75 else 'MEDIUM' if quality_score >= 50 else 'LOW'
         
@@ -236,44 +299,11 @@ class FundamentalAnalyzer:
     def _calculate_fundamental_score(self, valuation: Dict, ratios: Dict, 
                                    cash_flow: Dict, debt: Dict, growth: Dict, quality: Dict) -> Dict[str, any]:
         """Calculate overall fundamental score."""
-        score = 0
         max_score = 100
-        
-        # Valuation score (25 points)
-        pe_ratio = valuation.get('pe_ratio', 0)
-        if 0 < pe_ratio < 15:
-            score += 25
-        elif 0 < pe_ratio < 25:
-            score += 15
-        elif 0 < pe_ratio < 35:
-            score += 5
-        
-        # Financial health score (25 points)
-        debt_to_equity = debt.get('debt_to_equity', 0)
-        if debt_to_equity < 0.3:
-            score += 25
-        elif debt_to_equity < 0.5:
-            score += 15
-        elif debt_to_equity < 0.7:
-            score += 5
-        
-        # Profitability score (25 points)
-        roe = ratios.get('roe', 0)
-        if roe > 0.15:
-            score += 25
-        elif roe > 0.10:
-            score += 15
-        elif roe > 0.05:
-            score += 5
-        
-        # Growth score (25 points)
-        revenue_growth = growth.get('revenue_growth', 0)
-        if revenue_growth > 0.15:
-            score += 25
-        elif revenue_growth > 0.10:
-            score += 15
-        elif revenue_growth > 0.05:
-            score += 5
+        score = _fundamental_score(
+            valuation.get('pe_ratio', 0), debt.get('debt_to_equity', 0),
+            ratios.get('roe', 0), growth.get('revenue_growth', 0)
+        )
         
         # Calculate percentage
         score_percentage = (score / max_score) * 100
@@ -332,8 +362,13 @@ class FundamentalAnalyzer:
         results = {}
         comparison_data = []
         
-        for ticker in tickers:
-            analysis = self.analyze_fundamentals(ticker)
+        # Each analysis blocks on its own yfinance requests, so overlap them (map keeps ticker order)
+        analyses = []
+        if tickers:
+            with ThreadPoolExecutor(max_workers=min(16, len(tickers))) as executor:
+                analyses = list(executor.map(self.analyze_fundamentals, tickers))
+        
+        for ticker, analysis in zip(tickers, analyses):
             if 'error' not in analysis:
                 results[ticker] = analysis
                 
@@ -343,15 +378,15 @@ class FundamentalAnalyzer:
                 
                 comparison_data.append({
                     'Ticker': ticker,
-                    'Score': f"{fundamental_score.get('score_percentage', 0):.1f}%",
+                    'Score': fundamental_score.get('score_percentage', 0),
                     'Rating': fundamental_score.get('rating', 'N/A'),
                     'Recommendation': recommendation.get('recommendation', 'N/A'),
                     'P/E Ratio': analysis.get('valuation_metrics', {}).get('pe_ratio', 0),
-                    'ROE': f"{analysis.get('financial_ratios', {}).get('roe', 0):.2%}",
-                    'Debt/Equity': f"{analysis.get('debt_analysis', {}).get('debt_to_equity', 0):.2f}"
+                    'ROE': analysis.get('financial_ratios', {}).get('roe', 0),
+                    'Debt/Equity': analysis.get('debt_analysis', {}).get('debt_to_equity', 0)
                 })
         
         return {
-            'comparison_table': pd.DataFrame(comparison_data),
+            'comparison_table': pd.DataFrame(comparison_data, columns=FUNDAMENTALS_TABLE_COLUMNS),
             'detailed_results': results
         } 
\ No newline at end of file
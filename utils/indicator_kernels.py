@@ -0,0 +1,205 @@
+import numpy as np
+try:
+    from numba import njit
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+    # Plain NumPy fallback when numba isn't installed
+
+    def njit(*args, **kwargs):
+        if args and callable(args[0]):
+            return args[0]
+        return lambda func: func
+
+
+@njit(cache=True)
+def sma_last(close: np.ndarray, n: int) -> float:
+    """
+    Latest simple moving average over the last n closes (NaN if there are fewer).
+    """
+    if close.shape[0] < n:
+        return np.nan
+    total = 0.0
+    for i in range(close.shape[0] - n, close.shape[0]):
+        total += close[i]
+    return total / n
+
+
+@njit(cache=True)
+def rsi_last(close: np.ndarray, n: int = 14) -> float:
+    """
+    Latest RSI using a simple n-period average of gains and losses.
+    Returns 50.0 (neutral) when there isn't enough data or the price is flat.
+    """
+    size = close.shape[0]
+    if size < n:
+        return 50.0
+
+    gain = 0.0
+    loss = 0.0
+    for i in range(max(size - n, 1), size):
+        change = close[i] - close[i - 1]
+        if change > 0:
+            gain += change
+        else:
+            loss -= change
+
+    if loss > 0:
+        return 100.0 - 100.0 / (1.0 + gain / loss)
+    if gain > 0:
+        return 100.0
+    return 50.0
+
+
+@njit(cache=True)
+def rsi_wilder(close: np.ndarray, period: int = 14) -> np.ndarray:
+    """
+    Full RSI series using Wilder's smoothing (RMA, alpha = 1/period), seeded with a
+    simple average of the first `period` changes. The first `period` values are NaN,
+    as is any bar where the price hasn't moved at all over the averaging window.
+    """
+    n = close.shape[0]
+    out = np.full(n, np.nan)
+    if n <= period:
+        return out
+
+    avg_gain = 0.0
+    avg_loss = 0.0
+    for i in range(1, n):
+        change = close[i] - close[i - 1]
+        gain = change if change > 0 else 0.0
+        loss = -change if change < 0 else 0.0
+        if i <= period:
+            avg_gain += gain / period
+            avg_loss += loss / period
+            if i < period:
+                continue
+        else:
+            avg_gain = (avg_gain * (period - 1) + gain) / period
+            avg_loss = (avg_loss * (period - 1) + loss) / period
+
+        if avg_loss > 0:
+            out[i] = 100.0 - 100.0 / (1.0 + avg_gain / avg_loss)
+        elif avg_gain > 0:
+            out[i] = 100.0
+    return out
+
+
+@njit(cache=True)
+def ema(values: np.ndarray, span: int) -> np.ndarray:
+    """
+    Exponential moving average matching pandas' ewm(span=span).mean() (adjust=True):
+    each value is the weighted mean of everything seen so far, so there's no warm-up NaN.
+    NaN inputs carry the previous average forward while still decaying its weight.
+    """
+    n = values.shape[0]
+    out = np.empty(n)
+    if n == 0:
+        return out
+
+    decay = 1.0 - 2.0 / (span + 1.0)
+    weighted = values[0]
+    old_weight = 1.0
+    seen = weighted == weighted
+    out[0] = weighted
+    for i in range(1, n):
+        value = values[i]
+        is_observation = value == value
+        if weighted == weighted:
+            old_weight *= decay
+            if is_observation:
+                if weighted != value:
+                    weighted = (old_weight * weighted + value) / (old_weight + 1.0)
+                old_weight += 1.0
+        elif is_observation:
+            weighted = value
+        seen = seen or is_observation
+        out[i] = weighted if seen else np.nan
+    return out
+
+
+@njit(cache=True)
+def _ema_step(weighted: float, old_weight: float, value: float, decay: float):
+    """One step of `ema`, returning the updated (average, weight of the past)."""
+    if weighted == weighted:
+        old_weight *= decay
+        if value == value:
+            if weighted != value:
+                weighted = (old_weight * weighted + value) / (old_weight + 1.0)
+            old_weight += 1.0
+    elif value == value:
+        weighted = value
+    return weighted, old_weight
+
+
+@njit(cache=True)
+def latest_indicators(close: np.ndarray, rsi_period: int = 14, fast: int = 12, slow: int = 26,
+                      signal: int = 9, bb_period: int = 20, bb_std: float = 2.0):
+    """
+    Latest value of every indicator the technical signals use, from one pass over the closes:
+    (rsi, ma_20, ma_50, ma_200, bb_upper, bb_lower, macd, macd_signal).
+
+    Matches the last element of rsi_wilder, pandas' rolling means, Bollinger Bands from the
+    rolling sample std, and the MACD built from `ema`. Anything without enough data is NaN.
+    """
+    n = close.shape[0]
+    if n == 0:
+        return np.nan, np.nan, np.nan, np.nan, np.nan, np.nan, np.nan, np.nan
+
+    # Recursive indicators (Wilder RSI, MACD EMAs) need the whole history
+    fast_decay = 1.0 - 2.0 / (fast + 1.0)
+    slow_decay = 1.0 - 2.0 / (slow + 1.0)
+    signal_decay = 1.0 - 2.0 / (signal + 1.0)
+    ema_fast = close[0]
+    ema_slow = close[0]
+    macd = ema_fast - ema_slow
+    macd_signal = macd
+    fast_weight = 1.0
+    slow_weight = 1.0
+    signal_weight = 1.0
+
+    avg_gain = 0.0
+    avg_loss = 0.0
+    rsi = np.nan
+    for i in range(1, n):
+        value = close[i]
+        ema_fast, fast_weight = _ema_step(ema_fast, fast_weight, value, fast_decay)
+        ema_slow, slow_weight = _ema_step(ema_slow, slow_weight, value, slow_decay)
+        macd = ema_fast - ema_slow
+        macd_signal, signal_weight = _ema_step(macd_signal, signal_weight, macd, signal_decay)
+
+        change = value - close[i - 1]
+        gain = change if change > 0 else 0.0
+        loss = -change if change < 0 else 0.0
+        if i <= rsi_period:
+            avg_gain += gain / rsi_period
+            avg_loss += loss / rsi_period
+            if i < rsi_period:
+                continue
+        else:
+            avg_gain = (avg_gain * (rsi_period - 1) + gain) / rsi_period
+            avg_loss = (avg_loss * (rsi_period - 1) + loss) / rsi_period
+        if avg_loss > 0:
+            rsi = 100.0 - 100.0 / (1.0 + avg_gain / avg_loss)
+        elif avg_gain > 0:
+            rsi = 100.0
+        else:
+            rsi = np.nan
+
+    # Windowed indicators only need the tail
+    ma_20 = sma_last(close, 20)
+    ma_50 = sma_last(close, 50)
+    ma_200 = sma_last(close, 200)
+
+    bb_upper = np.nan
+    bb_lower = np.nan
+    if n >= bb_period and bb_period > 1:
+        middle = sma_last(close, bb_period)
+        squares = 0.0
+        for i in range(n - bb_period, n):
+            squares += (close[i] - middle) ** 2
+        width = bb_std * np.sqrt(squares / (bb_period - 1))
+        bb_upper = middle + width
+        bb_lower = middle - width
+
+    return rsi, ma_20, ma_50, ma_200, bb_upper, bb_lower, macd, macd_signal
@@ -1,26 +1,111 @@
 import openai
+import asyncio
 import time
 import os
 from dotenv import load_dotenv
+from data_sources.cache import disk_memoize
 
 load_dotenv()
 api_key = os.getenv("OPENAI_API_KEY")
-client = openai.OpenAI(api_key=api_key)
+client = openai.OpenAI(api_key=api_key, timeout=30)
 
-def call_gpt_with_retries(prompt, model="gpt-4", temperature=0.7, retries=3, delay=2):
+DEFAULT_MODEL = "gpt-4o-mini"
+RESPONSE_CACHE_SECONDS = 24 * 3600
+MAX_RETRY_AFTER_SECONDS = 60
+
+def _messages(prompt):
+    return [
+        {"role": "system", "content": "You are a helpful financial assistant."},
+        {"role": "user", "content": prompt}
+    ]
+
+def _retry_delay(error, attempt, delay):
+    """
+    Exponential backoff, or the server's Retry-After (seconds, capped at MAX_RETRY_AFTER_SECONDS)
+    when a rate limit response sends one.
+    """
+    if isinstance(error, openai.RateLimitError):
+        try:
+            return min(float(error.response.headers.get("retry-after")), MAX_RETRY_AFTER_SECONDS)
+        except (TypeError, ValueError):
+            pass
+    return delay * 2 ** attempt
+
+def _is_response(text):
+    return not text.startswith("❌")
+
+def call_gpt_with_retries(prompt, model=DEFAULT_MODEL, temperature=0.7, retries=3, delay=2, max_tokens=None):
+    # temperature=0 answers are deterministic enough to reuse across reruns
+    if temperature == 0:
+        return _cached_gpt_with_retries(prompt, model, temperature, retries, delay, max_tokens)
+    return _gpt_with_retries(prompt, model, temperature, retries, delay, max_tokens)
+
+def _gpt_with_retries(prompt, model, temperature, retries, delay, max_tokens):
     for attempt in range(retries):
         try:
             response = client.chat.completions.create(
                 model=model,
-                messages=[
-                    {"role": "system", "content": "You are a helpful financial assistant."},
-                    {"role": "user", "content": prompt}
-                ],
-                temperature=temperature
+                messages=_messages(prompt),
+                temperature=temperature,
+                max_tokens=max_tokens if max_tokens is not None else openai.NOT_GIVEN,
+                stream=False
+            )
+            return response.choices[0].message.content.strip()
+        except Exception as e:
+            if attempt < retries - 1:
+                time.sleep(_retry_delay(e, attempt, delay))
+            else:
+                return f"❌ GPT failed to respond after {retries} attempts.\n\nError: {e}"
+
+_cached_gpt_with_retries = disk_memoize(expire=RESPONSE_CACHE_SECONDS, cache_if=_is_response)(_gpt_with_retries)
+
+async def call_gpt_with_retries_async(prompt, model=DEFAULT_MODEL, temperature=0.7, retries=3, delay=2, max_tokens=None,
+                                     async_client=None):
+    """
+    Async version of call_gpt_with_retries, so several prompts can be in flight at once.
+    Shares the sync version's temperature=0 cache.
+    """
+    if async_client is None:
+        # Async clients are bound to the event loop they first run on, so make one per call
+        async with openai.AsyncOpenAI(api_key=api_key, timeout=30) as async_client:
+            return await call_gpt_with_retries_async(prompt, model, temperature, retries, delay, max_tokens, async_client)
+
+    args = (prompt, model, temperature, retries, delay, max_tokens)
+    if temperature == 0:
+        cached = _cached_gpt_with_retries.lookup(*args)
+        if cached is not None:
+            return cached
+
+    result = await _gpt_with_retries_async(async_client, *args)
+    if temperature == 0:
+        _cached_gpt_with_retries.store(result, *args)
+    return result
+
+async def _gpt_with_retries_async(async_client, prompt, model, temperature, retries, delay, max_tokens):
+    for attempt in range(retries):
+        try:
+            response = await async_client.chat.completions.create(
+                model=model,
+                messages=_messages(prompt),
+                temperature=temperature,
+                max_tokens=max_tokens if max_tokens is not None else openai.NOT_GIVEN,
+                stream=False
             )
             return response.choices[0].message.content.strip()
         except Exception as e:
             if attempt < retries - 1:
-                time.sleep(delay)
+                await asyncio.sleep(_retry_delay(e, attempt, delay))
             else:
-                return f"❌ GPT failed to respond after {retries} attempts.\n\nError: {e}"
\ No newline at end of file
+                return f"❌ GPT failed to respond after {retries} attempts.\n\nError: {e}"
+
+def call_gpt_many(prompts, **kwargs):
+    """
+    Send several prompts concurrently. Returns the responses in prompt order.
+    """
+    async def gather():
+        # A client per batch: its connection pool is tied to the event loop asyncio.run creates
+        async with openai.AsyncOpenAI(api_key=api_key, timeout=30) as batch_client:
+            return await asyncio.gather(*(
+                call_gpt_with_retries_async(prompt, async_client=batch_client, **kwargs) for prompt in prompts
+            ))
+    return asyncio.run(gather()) if prompts else []
@@ -2,6 +2,13 @@
 Market Configuration for Multi-Market Support
 """
 
+import logging
+import sys
+from functools import lru_cache
+from types import MappingProxyType
+
+logger = logging.getLogger(__name__)
+
 # Market configurations
 MARKET_CONFIGS = {
     "US": {
@@ -178,7 +185,6 @@ MARKET_COMPANY_MAPPINGS = {
         'OKTA': 'OKTA',
         'TWILIO': 'TWLO',
         'SHOPIFY': 'SHOP',
-        'SQUARE': 'SQ',
         'STRIPE': 'STRIPE',
         'PLAID': 'PLAID'
     },
@@ -238,51 +244,116 @@ MARKET_COMPANY_MAPPINGS = {
     # }
 }
 
+def _intern_all(items):
+    return tuple(sys.intern(item) for item in items)
+
+def _intern_mapping(mapping):
+    return {sys.intern(key): sys.intern(value) for key, value in mapping.items()}
+
+# Freeze the tables: read-only mappings with tuple lists, so no caller can mutate shared module state.
+# Tickers, names and market codes are interned so lookups against them mostly compare by identity.
+MARKET_CONFIGS = MappingProxyType({
+    sys.intern(market_code): MappingProxyType({
+        **config,
+        "popular_stocks": _intern_all(config["popular_stocks"]),
+        "sectors": _intern_all(config["sectors"]),
+        **({"stock_names": MappingProxyType(_intern_mapping(config["stock_names"]))} if "stock_names" in config else {}),
+    })
+    for market_code, config in MARKET_CONFIGS.items()
+})
+MARKET_COMPANY_MAPPINGS = MappingProxyType({
+    sys.intern(market_code): MappingProxyType(_intern_mapping(mapping))
+    for market_code, mapping in MARKET_COMPANY_MAPPINGS.items()
+})
+
+def _build_company_index(mapping):
+    index = {}
+    for name, ticker in mapping.items():
+        key = name.casefold()
+        if key in index and index[key] != ticker:
+            logger.warning("Company name %r maps to both %s and %s; keeping %s", name, index[key], ticker, ticker)
+        index[key] = ticker
+    return MappingProxyType(index)
+
+# Case-insensitive company name -> ticker index per market, built once
+_COMPANY_TO_TICKER = {market_code: _build_company_index(mapping) for market_code, mapping in MARKET_COMPANY_MAPPINGS.items()}
+
+# Ticker suffix per market, flattened out of the configs (unknown markets use the US one)
+_SUFFIX_BY_MARKET = {market_code: config.get("suffix", "") for market_code, config in MARKET_CONFIGS.items()}
+_DEFAULT_SUFFIX = _SUFFIX_BY_MARKET["US"]
+
+# (market, ticker) -> display name across all markets. The US fallback has no names, so unknown markets miss too.
+_STOCK_NAMES = {
+    (market_code, ticker): name
+    for market_code, config in MARKET_CONFIGS.items()
+    for ticker, name in config.get("stock_names", {}).items()
+}
+
+# Configs are frozen above, so results can be memoized and shared safely
+@lru_cache(maxsize=16)
 def get_market_config(market_code):
     """Get configuration for a specific market"""
     return MARKET_CONFIGS.get(market_code, MARKET_CONFIGS["US"])
 
+@lru_cache(maxsize=16)
 def get_market_companies(market_code):
     """Get company mappings for a specific market"""
     return MARKET_COMPANY_MAPPINGS.get(market_code, MARKET_COMPANY_MAPPINGS["US"])
 
+def lookup_company(name, market_code):
+    """Ticker for a company name in a market (case-insensitive), or None if unknown"""
+    index = _COMPANY_TO_TICKER.get(market_code, _COMPANY_TO_TICKER["US"])
+    return index.get(name.strip().casefold())
+
 def format_ticker(ticker, market_code):
     """Format ticker with market suffix if needed"""
-    config = get_market_config(market_code)
-    suffix = config.get("suffix", "")
-    
-    if suffix and not ticker.endswith(suffix):
-        return f"{ticker}{suffix}"
-    return ticker
+    suffix = _SUFFIX_BY_MARKET.get(market_code, _DEFAULT_SUFFIX)
+    return ticker if not suffix or ticker.endswith(suffix) else ticker + suffix
+
+def format_tickers(tickers, market_code):
+    """Format a batch of tickers with the market suffix, looking the suffix up once"""
+    suffix = _SUFFIX_BY_MARKET.get(market_code, _DEFAULT_SUFFIX)
+    if not suffix:
+        return list(tickers)
+    return [ticker if ticker.endswith(suffix) else ticker + suffix for ticker in tickers]
+
+def _make_formatter(currency_symbol):
+    # The symbol is closed over, so formatting skips the per-call config lookup
+    def format_amount(amount):
+        if isinstance(amount, (int, float)):
+            return f"{currency_symbol}{amount:,.2f}"
+        return f"{currency_symbol}{amount}"
+    return format_amount
 
 def format_currency(amount, market_code):
     """Format amount with market currency"""
-    config = get_market_config(market_code)
-    currency_symbol = config.get("currency_symbol", "$")
-    currency = config.get("currency", "USD")
+    return _FORMATTERS.get(market_code, _DEFAULT_FORMATTER)(amount)
+
+def format_currency_array(amounts, market_code):
+    """Format a batch of amounts with market currency; a pandas Series comes back as a Series"""
+    format_amount = _FORMATTERS.get(market_code, _DEFAULT_FORMATTER)
     
-    if isinstance(amount, (int, float)):
-        return f"{currency_symbol}{amount:,.2f}"
-    return f"{currency_symbol}{amount}"
+    if hasattr(amounts, "map"):
+        return amounts.map(format_amount)
+    return [format_amount(amount) for amount in amounts]
+
+# Currency formatter per market, specialized at import (unknown markets use the US one)
+_FORMATTERS = {market_code: _make_formatter(config.get("currency_symbol", "$")) for market_code, config in MARKET_CONFIGS.items()}
+_DEFAULT_FORMATTER = _FORMATTERS["US"]
 
+@lru_cache(maxsize=16)
 def get_popular_stocks(market_code):
     """Get popular stocks for a market"""
     config = get_market_config(market_code)
-    return config.get("popular_stocks", [])
+    return config.get("popular_stocks", ())
 
+@lru_cache(maxsize=16)
 def get_market_sectors(market_code):
     """Get sectors for a market"""
     config = get_market_config(market_code)
-    return config.get("sectors", [])
+    return config.get("sectors", ())
 
 def get_stock_name(ticker, market_code):
     """Get formatted stock name with Mandarin and English"""
-    config = get_market_config(market_code)
-    stock_names = config.get("stock_names", {})
-    
-    # If we have a specific name mapping, use it
-    if ticker in stock_names:
-        return stock_names[ticker]
-    
-    # Otherwise, return just the ticker
-    return ticker
+    # If we have a specific name mapping, use it; otherwise, return just the ticker
+    return _STOCK_NAMES.get((market_code, ticker), ticker)
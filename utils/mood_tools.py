@@ -1,12 +1,17 @@
 # utils/mood_tools.py
 
+import re
+
+_MOOD_RE = re.compile(r"Risk-(On|Off)")
+
 def detect_macro_mood_label(mood_text: str) -> str:
     """
     Classifies the market mood string into a label: Risk-On, Risk-Off, or Unknown.
     """
-    if "Risk-On" in mood_text:
+    # One pass over the text: Risk-On wins even if Risk-Off is mentioned first
+    match = _MOOD_RE.search(mood_text)
+    if match is None:
+        return "Unknown"
+    if match.group(1) == "On" or "Risk-On" in mood_text[match.end():]:
         return "Risk-On"
-    elif "Risk-Off" in mood_text:
-        return "Risk-Off"
-    else:
-        return "Unknown"
\ No newline at end of file
+    return "Risk-Off"
@@ -1,27 +1,47 @@
-import pandas as pd
+import csv
+import io
 from datetime import datetime
 import os
+from utils.mood_tools import detect_macro_mood_label
 
 MOOD_LOG_FILE = "macro_mood_log.csv"
 
+# (date, mood) last known to be in the log, so reruns on the same day skip reading it
+_LAST_SAVED = None
+
 def save_macro_mood(mood_text):
+    global _LAST_SAVED
+
     # Determine if Risk-On or Risk-Off
-    if "Risk-On" in mood_text:
-        mood = "Risk-On"
-    elif "Risk-Off" in mood_text:
-        mood = "Risk-Off"
-    else:
-        mood = "Unknown"
+    mood = detect_macro_mood_label(mood_text)
 
     today = datetime.now().strftime("%Y-%m-%d")
+    if _LAST_SAVED == (today, mood):
+        return
+
+    # If file exists, scan it for today's entry
+    file_exists = os.path.exists(MOOD_LOG_FILE)
+    already_saved = False
+    if file_exists:
+        with open(MOOD_LOG_FILE, newline="") as f:
+            already_saved = any(row["date"] == today and row["mood"] == mood for row in csv.DictReader(f))
 
-    # If file exists, load it
-    if os.path.exists(MOOD_LOG_FILE):
-        df = pd.read_csv(MOOD_LOG_FILE)
-    else:
-        df = pd.DataFrame(columns=["date", "mood"])
+    # Only save if today not already saved, appending the row instead of rewriting the whole log
+    if not already_saved:
+        buffer = io.StringIO()
+        writer = csv.writer(buffer, lineterminator="\n")  # same line endings as pandas wrote
+        if not file_exists:
+            writer.writerow(["date", "mood"])
+        writer.writerow([today, mood])
 
-    # Only save if today not already saved
-    if not ((df["date"] == today) & (df["mood"] == mood)).any():
-        df = pd.concat([df, pd.DataFrame({"date": [today], "mood": [mood]})], ignore_index=True)
-        df.to_csv(MOOD_LOG_FILE, index=False)
\ No newline at end of file
+        if file_exists:
+            # One write call, so a crash can't leave half a row behind
+            with open(MOOD_LOG_FILE, "a", newline="") as f:
+                f.write(buffer.getvalue())
+        else:
+            # Create the log under a temporary name and rename it into place, so it never exists without its header
+            tmp_file = MOOD_LOG_FILE + ".tmp"
+            with open(tmp_file, "w", newline="") as f:
+                f.write(buffer.getvalue())
+            os.replace(tmp_file, MOOD_LOG_FILE)
+    _LAST_SAVED = (today, mood)
@@ -1,32 +1,50 @@
 # utils/pdf_report.py
 
+from concurrent.futures import Future
 from fpdf import FPDF
 
+HEADING_FONT = ("Arial", "B", 14)
+BODY_FONT = ("Arial", "", 12)
+
 class PDF(FPDF):
     def header(self):
         self.set_font('Arial', 'B', 16)
         self.cell(0, 10, 'AI Stock Advisor Report', 0, 1, 'C')
         self.ln(10)
 
-def generate_pdf_report(summaries, risk_analysis, filename):
+def _section(pdf, title, body):
+    # Core-font metrics are loaded on first use and then reused, so switching fonts per section stays cheap
+    pdf.set_font(*HEADING_FONT)
+    pdf.cell(0, 10, title, ln=True)
+    pdf.set_font(*BODY_FONT)
+    pdf.multi_cell(0, 10, body)
+
+def generate_pdf_report(summaries, risk_analysis, filename=None):
+    """
+    Writes the report to `filename`, or returns it as PDF bytes when no filename is given
+    (e.g. for st.download_button) so serving it skips the round trip through a file.
+
+    `summaries` can be any iterable of (ticker, summary), including a generator, and is consumed
+    as it goes. `risk_analysis` may be a Future (e.g. an LLM call submitted to an executor); it is
+    only waited on once the ticker sections are laid out.
+    """
     pdf = FPDF()
     pdf.add_page()
-    pdf.set_font("Arial", size=12)
+    pdf.set_font(*BODY_FONT)
 
     pdf.cell(0, 10, "AI Stock Research Report", ln=True, align="C")
     pdf.ln(10)
 
     for ticker, stock_summary in summaries:
-        pdf.set_font("Arial", "B", 14)
-        pdf.cell(0, 10, f"{ticker}", ln=True)
-
-        pdf.set_font("Arial", "", 12)
-        pdf.multi_cell(0, 10, stock_summary)
+        _section(pdf, f"{ticker}", stock_summary)
         pdf.ln(5)
 
-    pdf.set_font("Arial", "B", 14)
-    pdf.cell(0, 10, "Risk Comparison", ln=True)
-    pdf.set_font("Arial", "", 12)
-    pdf.multi_cell(0, 10, risk_analysis)
+    if isinstance(risk_analysis, Future):
+        risk_analysis = risk_analysis.result()
+    _section(pdf, "Risk Comparison", risk_analysis)
 
-    pdf.output(filename)
\ No newline at end of file
+    if filename is None:
+        out = pdf.output(dest="S")
+        # fpdf2 returns a bytearray, PyFPDF 1.x a latin-1 str
+        return bytes(out) if isinstance(out, (bytes, bytearray)) else out.encode("latin-1")
+    pdf.output(filename)
@@ -1,9 +1,6 @@
 # utils/prompts.py
 
-def get_stock_summary_prompt(ticker, company_name, price, price_change, headlines):
-    headlines_text = "\n".join(f"- {headline}" for headline in headlines)
-
-    prompt = f"""
+_PROMPT_TMPL = """
 You are an AI financial analyst assistant.
 
 Summarize the recent activity for {company_name} ({ticker}).
@@ -17,5 +14,16 @@ Recent news headlines:
 Focus on any important developments, earnings reports, or news that might affect the stock price. 
 Keep it concise and easy for a non-expert investor to understand.
 """
-    return prompt
 
+def get_stock_summary_prompt(ticker, company_name, price, price_change, headlines):
+    # One join for the whole bullet list rather than an f-string per headline
+    headlines = list(map(str, headlines))
+    headlines_text = "- " + "\n- ".join(headlines) if headlines else ""
+
+    return _PROMPT_TMPL.format_map({
+        "company_name": company_name,
+        "ticker": ticker,
+        "price": price,
+        "price_change": price_change,
+        "headlines_text": headlines_text,
+    })
@@ -1,8 +1,19 @@
 import pandas as pd
 import numpy as np
-import yfinance as yf
 from typing import Dict, List, Tuple, Optional
 from dataclasses import dataclass
+from functools import lru_cache
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date
+import time
+from data_sources.cache import disk_memoize
+from data_sources.stock_prices import bulk_history
+
+PRICE_HISTORY_TTL_SECONDS = 3600
+CORRELATION_TTL_SECONDS = 24 * 3600
+
+# Column layout of RiskManager._positions_array
+ALLOCATION, ENTRY_PRICE, STOP_LOSS, SHARES = range(4)
 
 @dataclass
 class Position:
@@ -15,6 +26,61 @@ class Position:
     stop_loss: Optional[float] = None
     take_profit: Optional[float] = None
 
+@lru_cache(maxsize=64)
+def _cached_close_prices(tickers: Tuple[str, ...], period: str, time_bucket: int) -> pd.DataFrame:
+    """
+    Close prices for several tickers (one column each) from one batched, threaded yf.download call.
+    time_bucket only keys the cache, so a ticker set is downloaded at most once per TTL window.
+    """
+    histories = bulk_history(list(tickers), period)
+    closes = {ticker: hist['Close'] for ticker, hist in histories.items() if not hist.empty}
+    
+    if not closes:
+        raise LookupError(tickers)  # lru_cache doesn't store exceptions, so failed downloads are retried
+    return pd.DataFrame(closes)
+
+def _close_prices(tickers: Tuple[str, ...], period: str) -> pd.DataFrame:
+    """Close prices with one column per ticker that has data, in the given order (treat as read-only)."""
+    try:
+        closes = _cached_close_prices(tuple(sorted(tickers)), period, int(time.time() // PRICE_HISTORY_TTL_SECONDS))
+    except LookupError:
+        return pd.DataFrame()
+    return closes[[ticker for ticker in tickers if ticker in closes.columns]]
+
+@disk_memoize(expire=CORRELATION_TTL_SECONDS, cache_if=lambda analysis: 'error' not in analysis)
+def _correlation_analysis(tickers: Tuple[str, ...], period: str, max_correlation: float, day: str) -> Dict[str, any]:
+    # day only keys the cache, so an analysis is computed at most once per day
+    df = _close_prices(tickers, period)
+    
+    if len(df.columns) < 2:
+        return {"error": "Could not fetch sufficient price data"}
+    
+    # Create correlation matrix from daily log returns; price levels share trends that inflate correlations
+    returns = np.log(df).diff().iloc[1:]
+    correlation_matrix = returns.corr()
+    
+    # Find high correlations over the upper triangle (each pair once) in one vectorized pass
+    matrix = correlation_matrix.to_numpy()
+    rows, cols = np.triu_indices(len(matrix), k=1)
+    pair_correlations = matrix[rows, cols]
+    high = np.abs(pair_correlations) > max_correlation
+    names = correlation_matrix.columns
+    high_correlations = [
+        {'stock1': names[i], 'stock2': names[j], 'correlation': corr_value}
+        for i, j, corr_value in zip(rows[high], cols[high], pair_correlations[high])
+    ]
+    
+    # Calculate average correlation
+    avg_correlation = pair_correlations.mean()
+    
+    return {
+        'correlation_matrix': correlation_matrix,
+        'high_correlations': high_correlations,
+        'average_correlation': avg_correlation,
+        'diversification_score': 1 - avg_correlation,
+        'risk_level': 'HIGH' if len(high_correlations) > 0 else 'LOW'
+    }
+
 class RiskManager:
     """
     Risk management module for portfolio protection and position sizing.
@@ -90,24 +156,37 @@ class RiskManager:
         Returns:
             Dict with stop loss recommendations
         """
+        levels = self.calculate_stop_loss_batch(np.array([entry_price], dtype=np.float64), atr_multiplier, percentage_stop)
+        return {key: float(values[0]) for key, values in levels.items()}
+    
+    def calculate_stop_loss_batch(self, entry_prices: np.ndarray, atr_multiplier: float = 2.0,
+                                  percentage_stop: float = 0.05) -> Dict[str, np.ndarray]:
+        """
+        Vectorized calculate_stop_loss for many entry prices at once.
+        
+        Returns:
+            Dict with the same keys as calculate_stop_loss, each an array aligned with entry_prices
+        """
+        entry_prices = np.asarray(entry_prices, dtype=np.float64)
+        
         # Percentage-based stop loss
-        percentage_stop_price = entry_price * (1 - percentage_stop)
+        percentage_stop_prices = entry_prices * (1 - percentage_stop)
         
         # ATR-based stop loss (simplified)
-        atr_stop_price = entry_price * (1 - (atr_multiplier * 0.02))  # Assuming 2% ATR
+        atr_stop_prices = entry_prices * (1 - (atr_multiplier * 0.02))  # Assuming 2% ATR
         
         # Support-based stop loss (simplified)
-        support_stop_price = entry_price * 0.95  # 5% below entry
+        support_stop_prices = entry_prices * 0.95  # 5% below entry
         
         # Choose the most conservative stop loss
-        stop_loss_price = max(percentage_stop_price, atr_stop_price, support_stop_price)
+        stop_loss_prices = np.maximum.reduce([percentage_stop_prices, atr_stop_prices, support_stop_prices])
         
         return {
-            'stop_loss_price': stop_loss_price,
-            'percentage_stop': percentage_stop_price,
-            'atr_stop': atr_stop_price,
-            'support_stop': support_stop_price,
-            'risk_percentage': (entry_price - stop_loss_price) / entry_price
+            'stop_loss_price': stop_loss_prices,
+            'percentage_stop': percentage_stop_prices,
+            'atr_stop': atr_stop_prices,
+            'support_stop': support_stop_prices,
+            'risk_percentage': (entry_prices - stop_loss_prices) / entry_prices
         }
     
     def calculate_take_profit(self, entry_price: float, risk_reward_ratio: float = 2.0,
@@ -123,27 +202,56 @@ class RiskManager:
         Returns:
             Dict with take profit recommendations
         """
-        if stop_loss_price is None:
-            stop_loss_price = entry_price * 0.95
+        levels = self.calculate_take_profit_batch(
+            np.array([entry_price], dtype=np.float64), risk_reward_ratio,
+            None if stop_loss_price is None else np.array([stop_loss_price], dtype=np.float64)
+        )
+        return {key: float(values[0]) if isinstance(values, np.ndarray) else values for key, values in levels.items()}
+    
+    def calculate_take_profit_batch(self, entry_prices: np.ndarray, risk_reward_ratio: float = 2.0,
+                                    stop_loss_prices: Optional[np.ndarray] = None) -> Dict[str, np.ndarray]:
+        """
+        Vectorized calculate_take_profit for many entry prices at once.
+        
+        Returns:
+            Dict with the same keys as calculate_take_profit; price and amount entries are arrays
+            aligned with entry_prices
+        """
+        entry_prices = np.asarray(entry_prices, dtype=np.float64)
+        if stop_loss_prices is None:
+            stop_loss_prices = entry_prices * 0.95
         
-        risk = entry_price - stop_loss_price
+        risk = entry_prices - np.asarray(stop_loss_prices, dtype=np.float64)
         reward = risk * risk_reward_ratio
         
-        take_profit_price = entry_price + reward
+        take_profit_prices = entry_prices + reward
         
         return {
-            'take_profit_price': take_profit_price,
+            'take_profit_price': take_profit_prices,
             'risk_reward_ratio': risk_reward_ratio,
             'reward_amount': reward,
             'risk_amount': risk
         }
     
-    def calculate_portfolio_risk_metrics(self, positions: List[Position]) -> Dict[str, float]:
+    @staticmethod
+    def _positions_array(positions: List[Position]) -> np.ndarray:
+        """
+        Positions as one contiguous (N, 4) float64 array with columns
+        ALLOCATION, ENTRY_PRICE, STOP_LOSS (0 when unset) and SHARES, for vectorized metrics.
+        """
+        return np.fromiter(
+            ((pos.allocation, pos.entry_price, pos.stop_loss or 0.0, pos.shares) for pos in positions),
+            dtype=np.dtype((np.float64, 4)), count=len(positions)
+        )
+    
+    def calculate_portfolio_risk_metrics(self, positions: List[Position],
+                                         positions_array: Optional[np.ndarray] = None) -> Dict[str, float]:
         """
         Calculate portfolio risk metrics.
         
         Args:
             positions: List of current positions
+            positions_array: Optional output of _positions_array(positions); built here when omitted
         
         Returns:
             Dict with risk metrics
@@ -157,11 +265,14 @@ class RiskManager:
                 'sharpe_ratio': 0
             }
         
+        if positions_array is None:
+            positions_array = self._positions_array(positions)
+        
         # Calculate total allocation
-        total_allocation = sum(pos.allocation for pos in positions)
+        total_allocation = float(positions_array[:, ALLOCATION].sum())
         
         # Calculate portfolio beta (simplified)
-        portfolio_beta = sum(pos.allocation * 1.0 for pos in positions)  # Assuming beta = 1
+        portfolio_beta = total_allocation  # Assuming beta = 1
         
         # Calculate Value at Risk (simplified)
         # Assuming normal distribution with 15% annual volatility
@@ -201,44 +312,8 @@ class RiskManager:
             return {"warning": "Need at least 2 stocks for correlation analysis"}
         
         try:
-            # Fetch price data for correlation analysis
-            price_data = {}
-            for ticker in tickers:
-                stock = yf.Ticker(ticker)
-                hist = stock.history(period="6mo")
-                if not hist.empty:
-                    price_data[ticker] = hist['Close']
-            
-            if len(price_data) < 2:
-                return {"error": "Could not fetch sufficient price data"}
-            
-            # Create correlation matrix
-            df = pd.DataFrame(price_data)
-            correlation_matrix = df.corr()
-            
-            # Find high correlations
-            high_correlations = []
-            for i in range(len(correlation_matrix.columns)):
-                for j in range(i+1, len(correlation_matrix.columns)):
-                    corr_value = correlation_matrix.iloc[i, j]
-                    if abs(corr_value) > max_correlation:
-                        high_correlations.append({
-                            'stock1': correlation_matrix.columns[i],
-                            'stock2': correlation_matrix.columns[j],
-                            'correlation': corr_value
-                        })
-            
-            # Calculate average correlation
-            avg_correlation = correlation_matrix.values[np.triu_indices_from(correlation_matrix.values, k=1)].mean()
-            
-            return {
-                'correlation_matrix': correlation_matrix,
-                'high_correlations': high_correlations,
-                'average_correlation': avg_correlation,
-                'diversification_score': 1 - avg_correlation,
-                'risk_level': 'HIGH' if len(high_correlations) > 0 else 'LOW'
-            }
-            
+            # Cached on disk per ticker list, period and threshold; the date in the key refreshes it daily
+            return _correlation_analysis(tuple(dict.fromkeys(tickers)), "6mo", max_correlation, date.today().isoformat())
         except Exception as e:
             return {"error": f"Error calculating correlations: {e}"}
     
@@ -253,33 +328,45 @@ class RiskManager:
         Returns:
             Dict with comprehensive risk analysis
         """
+        # Correlation analysis may have to download prices, so it runs in the background while the
+        # position metrics are computed. With fewer than 2 tickers it returns at once, so no thread is started.
+        correlation_future = None
+        if len(tickers) >= 2:
+            executor = ThreadPoolExecutor(max_workers=1)
+            correlation_future = executor.submit(self.check_correlation_risk, tickers)
+            executor.shutdown(wait=False)  # the worker exits once this one task is done
+        
+        # Positions are converted once and shared by the portfolio and position-level metrics
+        positions_array = self._positions_array(positions)
+        
         # Portfolio risk metrics
-        risk_metrics = self.calculate_portfolio_risk_metrics(positions)
+        risk_metrics = self.calculate_portfolio_risk_metrics(positions, positions_array)
         
-        # Correlation analysis
-        correlation_analysis = self.check_correlation_risk(tickers)
-        
-        # Position-level risk analysis
-        position_risks = []
-        for pos in positions:
-            if pos.stop_loss:
-                risk_amount = (pos.entry_price - pos.stop_loss) * pos.shares
-                risk_pct = (pos.entry_price - pos.stop_loss) / pos.entry_price
-            else:
-                risk_amount = 0
-                risk_pct = 0
-            
-            position_risks.append({
+        # Position-level risk analysis, vectorized over all positions (no stop loss means no risk counted)
+        entry_prices = positions_array[:, ENTRY_PRICE]
+        stop_losses = positions_array[:, STOP_LOSS]
+        shares = positions_array[:, SHARES]
+        has_stop = stop_losses != 0
+        
+        risk_per_share = np.where(has_stop, entry_prices - stop_losses, 0.0)
+        risk_amounts = risk_per_share * shares
+        with np.errstate(divide='ignore', invalid='ignore'):
+            risk_percentages = np.where(has_stop, risk_per_share / entry_prices, 0.0)
+        
+        position_risks = [
+            {
                 'ticker': pos.ticker,
                 'allocation': pos.allocation,
                 'risk_amount': risk_amount,
                 'risk_percentage': risk_pct,
                 'stop_loss': pos.stop_loss,
                 'take_profit': pos.take_profit
-            })
+            }
+            for pos, risk_amount, risk_pct in zip(positions, risk_amounts.tolist(), risk_percentages.tolist())
+        ]
         
         # Overall risk assessment
-        total_risk = sum(pr['risk_amount'] for pr in position_risks)
+        total_risk = float(risk_amounts.sum())
         risk_to_portfolio = total_risk / self.portfolio_value if self.portfolio_value > 0 else 0
         
         risk_level = 'LOW'
@@ -288,6 +375,12 @@ class RiskManager:
         elif risk_to_portfolio > 0.02:
             risk_level = 'MEDIUM'
         
+        # Correlation analysis
+        if correlation_future is not None:
+            correlation_analysis = correlation_future.result()
+        else:
+            correlation_analysis = self.check_correlation_risk(tickers)
+        
         return {
             'portfolio_risk_metrics': risk_metrics,
             'correlation_analysis': correlation_analysis,
@@ -1,13 +1,41 @@
 import pandas as pd
 import numpy as np
-import yfinance as yf
-from typing import Dict, Tuple, Optional
+from typing import Dict, List, Tuple, Optional, Union
+from concurrent.futures import ThreadPoolExecutor
 try:
     import talib
     TALIB_AVAILABLE = True
 except ImportError:
     TALIB_AVAILABLE = False
     # Silent fallback for cloud deployment
+from utils.indicator_kernels import ema, latest_indicators, rsi_wilder, NUMBA_AVAILABLE
+from data_sources.cache import disk_memoize
+from data_sources.stock_prices import bulk_history, get_ticker
+
+HISTORY_TTL_SECONDS = 3600
+
+# pandas can JIT rolling-window aggregations with numba (compiled on first use); otherwise its default Cython path
+ROLLING_ENGINE = dict(engine='numba', engine_kwargs={'parallel': True}) if NUMBA_AVAILABLE else {}
+
+@disk_memoize(expire=HISTORY_TTL_SECONDS, cache_if=lambda data: not data.empty)
+def _cached_history(ticker: str, period: str) -> pd.DataFrame:
+    # Kept on disk so reruns and restarts within the hour skip the Yahoo round trip
+    return get_ticker(ticker).history(period=period)
+
+# Indicator methods take a price Series or a bare float64 array, and return the same kind
+Prices = Union[pd.Series, np.ndarray]
+
+def _price_values(prices: Prices) -> np.ndarray:
+    """float64 values of a price Series or array, without copying when they already are."""
+    if isinstance(prices, pd.Series):
+        return prices.to_numpy(dtype=np.float64)
+    return np.asarray(prices, dtype=np.float64)
+
+def _like_prices(values, prices: Prices):
+    """Indicator values as a Series on the prices' index, or as an array when prices was an array."""
+    if isinstance(prices, pd.Series):
+        return values if isinstance(values, pd.Series) else pd.Series(values, index=prices.index)
+    return values.to_numpy() if isinstance(values, pd.Series) else values
 
 class TechnicalAnalyzer:
     """
@@ -29,19 +57,17 @@ class TechnicalAnalyzer:
             DataFrame with OHLCV data
         """
         try:
-            stock = yf.Ticker(ticker)
-            data = stock.history(period=period)
-            return data
+            return _cached_history(ticker, period)
         except Exception as e:
             print(f"Error fetching data for {ticker}: {e}")
             return pd.DataFrame()
     
-    def calculate_rsi(self, prices: pd.Series, period: int = 14) -> pd.Series:
+    def calculate_rsi(self, prices: Prices, period: int = 14) -> Prices:
         """
         Calculate Relative Strength Index (RSI).
         
         Args:
-            prices: Price series
+            prices: Price series (or float64 array)
             period: RSI period (default 14)
         
         Returns:
@@ -49,56 +75,54 @@ class TechnicalAnalyzer:
         """
         if TALIB_AVAILABLE:
             try:
-                rsi = talib.RSI(prices.values, timeperiod=period)
-                return pd.Series(rsi, index=prices.index)
+                rsi = talib.RSI(_price_values(prices), timeperiod=period)
+                return _like_prices(rsi, prices)
             except:
                 pass
         
-        # Fallback calculation
-        delta = prices.diff()
-        gain = (delta.where(delta > 0, 0)).rolling(window=period).mean()
-        loss = (-delta.where(delta < 0, 0)).rolling(window=period).mean()
-        rs = gain / loss
-        rsi = 100 - (100 / (1 + rs))
-        return rsi
+        # Fallback calculation: Wilder's smoothing like TA-Lib, in one pass over the prices
+        rsi = rsi_wilder(_price_values(prices), period)
+        return _like_prices(rsi, prices)
     
-    def calculate_moving_averages(self, prices: pd.Series) -> Dict[str, pd.Series]:
+    def calculate_moving_averages(self, prices: Prices) -> Dict[str, Prices]:
         """
         Calculate various moving averages.
         
         Args:
-            prices: Price series
+            prices: Price series (or float64 array)
         
         Returns:
             Dict with different MA values
         """
         if TALIB_AVAILABLE:
             try:
-                ma_20 = talib.SMA(prices.values, timeperiod=20)
-                ma_50 = talib.SMA(prices.values, timeperiod=50)
-                ma_200 = talib.SMA(prices.values, timeperiod=200)
+                values = _price_values(prices)
+                ma_20 = talib.SMA(values, timeperiod=20)
+                ma_50 = talib.SMA(values, timeperiod=50)
+                ma_200 = talib.SMA(values, timeperiod=200)
                 
                 return {
-                    'MA_20': pd.Series(ma_20, index=prices.index),
-                    'MA_50': pd.Series(ma_50, index=prices.index),
-                    'MA_200': pd.Series(ma_200, index=prices.index)
+                    'MA_20': _like_prices(ma_20, prices),
+                    'MA_50': _like_prices(ma_50, prices),
+                    'MA_200': _like_prices(ma_200, prices)
                 }
             except:
                 pass
         
         # Fallback calculation
+        series = prices if isinstance(prices, pd.Series) else pd.Series(_price_values(prices))
         return {
-            'MA_20': prices.rolling(window=20).mean(),
-            'MA_50': prices.rolling(window=50).mean(),
-            'MA_200': prices.rolling(window=200).mean()
+            'MA_20': _like_prices(series.rolling(window=20).mean(**ROLLING_ENGINE), prices),
+            'MA_50': _like_prices(series.rolling(window=50).mean(**ROLLING_ENGINE), prices),
+            'MA_200': _like_prices(series.rolling(window=200).mean(**ROLLING_ENGINE), prices)
         }
     
-    def calculate_bollinger_bands(self, prices: pd.Series, period: int = 20, std_dev: float = 2) -> Dict[str, pd.Series]:
+    def calculate_bollinger_bands(self, prices: Prices, period: int = 20, std_dev: float = 2) -> Dict[str, Prices]:
         """
         Calculate Bollinger Bands.
         
         Args:
-            prices: Price series
+            prices: Price series (or float64 array)
             period: MA period (default 20)
             std_dev: Standard deviation multiplier (default 2)
         
@@ -107,32 +131,34 @@ class TechnicalAnalyzer:
         """
         if TALIB_AVAILABLE:
             try:
-                upper, middle, lower = talib.BBANDS(prices.values, timeperiod=period, nbdevup=std_dev, nbdevdn=std_dev)
+                upper, middle, lower = talib.BBANDS(_price_values(prices), timeperiod=period, nbdevup=std_dev, nbdevdn=std_dev)
                 
                 return {
-                    'BB_Upper': pd.Series(upper, index=prices.index),
-                    'BB_Middle': pd.Series(middle, index=prices.index),
-                    'BB_Lower': pd.Series(lower, index=prices.index)
+                    'BB_Upper': _like_prices(upper, prices),
+                    'BB_Middle': _like_prices(middle, prices),
+                    'BB_Lower': _like_prices(lower, prices)
                 }
             except:
                 pass
         
         # Fallback calculation
-        ma = prices.rolling(window=period).mean()
-        std = prices.rolling(window=period).std()
+        series = prices if isinstance(prices, pd.Series) else pd.Series(_price_values(prices))
+        window = series.rolling(window=period)
+        ma = window.mean(**ROLLING_ENGINE)
+        std = window.std(**ROLLING_ENGINE)
         
         return {
-            'BB_Upper': ma + (std * std_dev),
-            'BB_Middle': ma,
-            'BB_Lower': ma - (std * std_dev)
+            'BB_Upper': _like_prices(ma + (std * std_dev), prices),
+            'BB_Middle': _like_prices(ma, prices),
+            'BB_Lower': _like_prices(ma - (std * std_dev), prices)
         }
     
-    def calculate_macd(self, prices: pd.Series, fast: int = 12, slow: int = 26, signal: int = 9) -> Dict[str, pd.Series]:
+    def calculate_macd(self, prices: Prices, fast: int = 12, slow: int = 26, signal: int = 9) -> Dict[str, Prices]:
         """
         Calculate MACD (Moving Average Convergence Divergence).
         
         Args:
-            prices: Price series
+            prices: Price series (or float64 array)
             fast: Fast EMA period
             slow: Slow EMA period
             signal: Signal line period
@@ -142,61 +168,51 @@ class TechnicalAnalyzer:
         """
         if TALIB_AVAILABLE:
             try:
-                macd, signal_line, histogram = talib.MACD(prices.values, fastperiod=fast, slowperiod=slow, signalperiod=signal)
+                macd, signal_line, histogram = talib.MACD(_price_values(prices), fastperiod=fast, slowperiod=slow, signalperiod=signal)
                 
                 return {
-                    'MACD': pd.Series(macd, index=prices.index),
-                    'Signal': pd.Series(signal_line, index=prices.index),
-                    'Histogram': pd.Series(histogram, index=prices.index)
+                    'MACD': _like_prices(macd, prices),
+                    'Signal': _like_prices(signal_line, prices),
+                    'Histogram': _like_prices(histogram, prices)
                 }
             except:
                 pass
         
-        # Fallback calculation
-        ema_fast = prices.ewm(span=fast).mean()
-        ema_slow = prices.ewm(span=slow).mean()
-        macd_line = ema_fast - ema_slow
-        signal_line = macd_line.ewm(span=signal).mean()
+        # Fallback calculation (same EMAs as pandas' ewm(span=...).mean())
+        values = _price_values(prices)
+        macd_line = ema(values, fast) - ema(values, slow)
+        signal_line = ema(macd_line, signal)
         histogram = macd_line - signal_line
         
         return {
-            'MACD': macd_line,
-            'Signal': signal_line,
-            'Histogram': histogram
+            'MACD': _like_prices(macd_line, prices),
+            'Signal': _like_prices(signal_line, prices),
+            'Histogram': _like_prices(histogram, prices)
         }
     
-    def generate_technical_signals(self, ticker: str) -> Dict[str, any]:
+    def generate_technical_signals(self, ticker: str, data: Optional[pd.DataFrame] = None) -> Dict[str, any]:
         """
         Generate comprehensive technical analysis signals for a stock.
         
         Args:
             ticker: Stock ticker symbol
+            data: Already-fetched OHLCV data (fetched here if not given)
         
         Returns:
             Dict with technical signals and analysis
         """
-        data = self.get_stock_data(ticker)
+        if data is None:
+            data = self.get_stock_data(ticker)
         if data.empty:
             return {"error": f"Could not fetch data for {ticker}"}
         
-        close_prices = data['Close']
-        
-        # Calculate all indicators
-        rsi = self.calculate_rsi(close_prices)
-        moving_averages = self.calculate_moving_averages(close_prices)
-        bollinger_bands = self.calculate_bollinger_bands(close_prices)
-        macd_data = self.calculate_macd(close_prices)
+        # One float64 view of the closes, shared by every indicator
+        close_prices = data['Close'].to_numpy(dtype=np.float64)
         
         # Get latest values
-        current_price = close_prices.iloc[-1]
-        current_rsi = rsi.iloc[-1]
-        current_ma_20 = moving_averages['MA_20'].iloc[-1]
-        current_ma_50 = moving_averages['MA_50'].iloc[-1]
-        current_ma_200 = moving_averages['MA_200'].iloc[-1]
-        current_bb_upper = bollinger_bands['BB_Upper'].iloc[-1]
-        current_bb_lower = bollinger_bands['BB_Lower'].iloc[-1]
-        current_macd = macd_data['MACD'].iloc[-1]
-        current_signal = macd_data['Signal'].iloc[-1]
+        current_price = close_prices[-1]
+        (current_rsi, current_ma_20, current_ma_50, current_ma_200,
+         current_bb_upper, current_bb_lower, current_macd, current_signal) = self._latest_indicators(close_prices)
         
         # Generate signals
         signals = {
@@ -216,18 +232,60 @@ class TechnicalAnalyzer:
         
         return signals
     
+    def generate_technical_signals_batch(self, tickers: List[str], period: str = "6mo") -> Dict[str, Dict]:
+        """
+        Generate technical signals for several tickers, downloading all histories in a single batch.
+        
+        Returns:
+            Dict of technical signals: {ticker: signals}
+        """
+        tickers = list(dict.fromkeys(tickers))
+        if not tickers:
+            return {}
+        
+        try:
+            histories = bulk_history(tickers, period)
+        except Exception as e:
+            print(f"Error fetching data for {', '.join(tickers)}: {e}")
+            histories = {ticker: pd.DataFrame() for ticker in tickers}
+        
+        with ThreadPoolExecutor(max_workers=min(8, len(tickers))) as executor:
+            signals = executor.map(
+                lambda ticker: self.generate_technical_signals(ticker, data=histories[ticker]),
+                tickers
+            )
+            return dict(zip(tickers, signals))
+    
+    def _latest_indicators(self, close_prices: np.ndarray) -> Tuple[float, ...]:
+        """
+        Latest (rsi, ma_20, ma_50, ma_200, bb_upper, bb_lower, macd, macd_signal).
+        Without TA-Lib only these last values are needed, so they come from one fused pass
+        instead of building every indicator series.
+        """
+        if not TALIB_AVAILABLE:
+            return latest_indicators(close_prices)
+        
+        rsi = self.calculate_rsi(close_prices)
+        moving_averages = self.calculate_moving_averages(close_prices)
+        bollinger_bands = self.calculate_bollinger_bands(close_prices)
+        macd_data = self.calculate_macd(close_prices)
+        
+        return (rsi[-1], moving_averages['MA_20'][-1], moving_averages['MA_50'][-1],
+                moving_averages['MA_200'][-1], bollinger_bands['BB_Upper'][-1],
+                bollinger_bands['BB_Lower'][-1], macd_data['MACD'][-1], macd_data['Signal'][-1])
+    
     def _interpret_rsi(self, rsi: float) -> Dict[str, any]:
         """Interpret RSI values."""
         if rsi > 70:
-            return {"signal": "OVERBOUGHT", "strength": "STRONG", "action": "SELL"}
+            return {"signal": "OVERBOUGHT", "strength": "STRONG", "action": "SELL", "score": -1}
         elif rsi > 60:
-            return {"signal": "OVERBOUGHT", "strength": "WEAK", "action": "CAUTION"}
+            return {"signal": "OVERBOUGHT", "strength": "WEAK", "action": "CAUTION", "score": 0}
         elif rsi < 30:
-            return {"signal": "OVERSOLD", "strength": "STRONG", "action": "BUY"}
+            return {"signal": "OVERSOLD", "strength": "STRONG", "action": "BUY", "score": 1}
         elif rsi < 40:
-            return {"signal": "OVERSOLD", "strength": "WEAK", "action": "WATCH"}
+            return {"signal": "OVERSOLD", "strength": "WEAK", "action": "WATCH", "score": 0}
         else:
-            return {"signal": "NEUTRAL", "strength": "NEUTRAL", "action": "HOLD"}
+            return {"signal": "NEUTRAL", "strength": "NEUTRAL", "action": "HOLD", "score": 0}
     
     def _interpret_moving_averages(self, price: float, ma_20: float, ma_50: float, ma_200: float) -> Dict[str, any]:
         """Interpret moving average signals."""
@@ -235,78 +293,52 @@ class TechnicalAnalyzer:
         
         # Price vs MA signals
         if price > ma_20:
-            signals.append({"type": "PRICE_ABOVE_MA20", "signal": "BULLISH"})
+            signals.append({"type": "PRICE_ABOVE_MA20", "signal": "BULLISH", "score": 1})
         else:
-            signals.append({"type": "PRICE_BELOW_MA20", "signal": "BEARISH"})
+            signals.append({"type": "PRICE_BELOW_MA20", "signal": "BEARISH", "score": -1})
         
         if price > ma_50:
-            signals.append({"type": "PRICE_ABOVE_MA50", "signal": "BULLISH"})
+            signals.append({"type": "PRICE_ABOVE_MA50", "signal": "BULLISH", "score": 1})
         else:
-            signals.append({"type": "PRICE_BELOW_MA50", "signal": "BEARISH"})
+            signals.append({"type": "PRICE_BELOW_MA50", "signal": "BEARISH", "score": -1})
         
         if price > ma_200:
-            signals.append({"type": "PRICE_ABOVE_MA200", "signal": "BULLISH"})
+            signals.append({"type": "PRICE_ABOVE_MA200", "signal": "BULLISH", "score": 1})
         else:
-            signals.append({"type": "PRICE_BELOW_MA200", "signal": "BEARISH"})
+            signals.append({"type": "PRICE_BELOW_MA200", "signal": "BEARISH", "score": -1})
         
         # Golden/Death Cross
         if ma_20 > ma_50:
-            signals.append({"type": "GOLDEN_CROSS_20_50", "signal": "BULLISH"})
+            signals.append({"type": "GOLDEN_CROSS_20_50", "signal": "BULLISH", "score": 1})
         else:
-            signals.append({"type": "DEATH_CROSS_20_50", "signal": "BEARISH"})
+            signals.append({"type": "DEATH_CROSS_20_50", "signal": "BEARISH", "score": -1})
         
         return {"signals": signals}
     
     def _interpret_bollinger_bands(self, price: float, upper: float, lower: float) -> Dict[str, any]:
         """Interpret Bollinger Bands signals."""
         if price > upper:
-            return {"signal": "OVERBOUGHT", "action": "SELL"}
+            return {"signal": "OVERBOUGHT", "action": "SELL", "score": -1}
         elif price < lower:
-            return {"signal": "OVERSOLD", "action": "BUY"}
+            return {"signal": "OVERSOLD", "action": "BUY", "score": 1}
         else:
-            return {"signal": "NEUTRAL", "action": "HOLD"}
+            return {"signal": "NEUTRAL", "action": "HOLD", "score": 0}
     
     def _interpret_macd(self, macd: float, signal: float) -> Dict[str, any]:
         """Interpret MACD signals."""
         if macd > signal:
-            return {"signal": "BULLISH", "strength": "STRONG" if macd > 0 else "WEAK"}
+            return {"signal": "BULLISH", "strength": "STRONG" if macd > 0 else "WEAK", "score": 1}
         else:
-            return {"signal": "BEARISH", "strength": "STRONG" if macd < 0 else "WEAK"}
+            return {"signal": "BEARISH", "strength": "STRONG" if macd < 0 else "WEAK", "score": -1}
     
     def _calculate_overall_signal(self, signals: Dict) -> Dict[str, any]:
         """Calculate overall technical signal and confidence."""
-        bullish_count = 0
-        bearish_count = 0
-        total_signals = 0
-        
-        # Count signals
-        if signals['rsi_signal']['action'] == 'BUY':
-            bullish_count += 1
-        elif signals['rsi_signal']['action'] == 'SELL':
-            bearish_count += 1
-        total_signals += 1
-        
-        # MA signals
-        for ma_signal in signals['ma_signals']['signals']:
-            if ma_signal['signal'] == 'BULLISH':
-                bullish_count += 1
-            elif ma_signal['signal'] == 'BEARISH':
-                bearish_count += 1
-            total_signals += 1
-        
-        # Bollinger Bands
-        if signals['bollinger_signals']['action'] == 'BUY':
-            bullish_count += 1
-        elif signals['bollinger_signals']['action'] == 'SELL':
-            bearish_count += 1
-        total_signals += 1
-        
-        # MACD
-        if signals['macd_signals']['signal'] == 'BULLISH':
-            bullish_count += 1
-        elif signals['macd_signals']['signal'] == 'BEARISH':
-            bearish_count += 1
-        total_signals += 1
+        # Each interpretation carries a score: +1 bullish, -1 bearish, 0 neutral
+        sources = [signals['rsi_signal'], *signals['ma_signals']['signals'],
+                   signals['bollinger_signals'], signals['macd_signals']]
+        scores = np.fromiter((source['score'] for source in sources), dtype=np.int8, count=len(sources))
+        bearish_count, _, bullish_count = np.bincount(scores + 1, minlength=3).tolist()
+        total_signals = len(sources)
         
         # Calculate overall signal
         if bullish_count > bearish_count:
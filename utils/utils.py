@@ -1,22 +1,41 @@
+from concurrent.futures import Future
 from fpdf import FPDF
 from datetime import datetime
-import requests
-import pickle
+from functools import lru_cache
+import time
 import os
 from dotenv import load_dotenv
+from data_sources.cache import decode_json, get_session
 
 load_dotenv()
 FINNHUB_API_KEY = os.getenv("FINNHUB_API_KEY")
 
-US_TICKERS_FILE = "us_tickers.pkl"
+US_TICKERS_FILE = "us_tickers.txt"  # one symbol per line
+US_TICKERS_MAX_AGE_SECONDS = 24 * 3600
+US_MICS = frozenset({"XNYS", "XNAS", "ARCX"})  # NYSE, Nasdaq, NYSE Arca
 
+@lru_cache(maxsize=4096)  # report titles and section headers repeat across reports
 def sanitize_text(text):
     """
     Remove characters that aren't compatible with latin-1 encoding (e.g., emojis).
     """
+    if text.isascii():
+        return text  # nothing to strip, so skip the encode/decode round trip
     return text.encode("latin-1", errors="ignore").decode("latin-1")
 
+def _pdf_block(text):
+    """
+    Sanitized text for a single multi_cell call. multi_cell swallows one trailing newline,
+    so it is doubled to keep the blank line a line-by-line render would have printed.
+    """
+    text = sanitize_text(text)
+    return text + "\n" if text.endswith("\n") else text
+
 def generate_pdf_report(summaries, risk_analysis, filename="report.pdf"):
+    """
+    `summaries` is any iterable of (ticker, summary), consumed as it goes. `risk_analysis` may be
+    a Future, which is only waited on after the ticker sections are written.
+    """
     pdf = FPDF()
     pdf.set_auto_page_break(auto=True, margin=15)
     pdf.add_page()
@@ -36,17 +55,18 @@ def generate_pdf_report(summaries, risk_analysis, filename="report.pdf"):
         pdf.cell(0, 10, sanitize_text(f"{ticker} Summary"), ln=True)
 
         pdf.set_font("Arial", "", 11)
-        for line in summary.split("\n"):
-            pdf.multi_cell(0, 8, sanitize_text(line))
+        # multi_cell breaks on the embedded newlines itself, so each block is one call
+        pdf.multi_cell(0, 8, _pdf_block(summary))
 
     # GPT Risk Comparison
+    if isinstance(risk_analysis, Future):
+        risk_analysis = risk_analysis.result()
     pdf.set_font("Arial", "B", 14)
     pdf.ln(10)
     pdf.cell(0, 10, sanitize_text("Risk Analysis"), ln=True)
 
     pdf.set_font("Arial", "", 11)
-    for line in risk_analysis.split("\n"):
-        pdf.multi_cell(0, 8, sanitize_text(line))
+    pdf.multi_cell(0, 8, _pdf_block(risk_analysis))
 
     # Save the PDF
     pdf.output(filename)
@@ -54,24 +74,32 @@ def generate_pdf_report(summaries, risk_analysis, filename="report.pdf"):
 def fetch_and_cache_us_tickers():
     """
     Fetches all US-listed stock symbols from Finnhub and caches them locally.
-    If cached data exists, it loads from file instead of making a new API call.
+    If cached data exists, it loads from file instead of making a new API call;
+    the file is refreshed once it is a day old (kept as-is if there's no API key).
     """
     if os.path.exists(US_TICKERS_FILE):
-        with open(US_TICKERS_FILE, "rb") as f:
-            return pickle.load(f)
+        fresh = time.time() - os.path.getmtime(US_TICKERS_FILE) < US_TICKERS_MAX_AGE_SECONDS
+        if fresh or not FINNHUB_API_KEY:
+            with open(US_TICKERS_FILE, encoding="utf-8") as f:
+                return frozenset(f.read().splitlines())
 
     if not FINNHUB_API_KEY:
         raise ValueError("⚠️ FINNHUB_API_KEY is not set in the environment.")
 
     url = f"https://finnhub.io/api/v1/stock/symbol?exchange=US&token={FINNHUB_API_KEY}"
-    response = requests.get(url)
+    # Pooled session with retries; requests already asks for and decodes gzip responses
+    response = get_session().get(url, timeout=30)
     response.raise_for_status()
-    data = response.json()
+    data = decode_json(response)  # orjson when installed; the symbol list is several MB
 
-    us_tickers = set(item["symbol"] for item in data if item.get("mic") in {"XNYS", "XNAS", "ARCX"})
+    # Stored upper-cased and frozen, so lookups never need to normalize the set side
+    us_tickers = frozenset(item["symbol"].upper() for item in data if item.get("mic") in US_MICS)
 
-    with open(US_TICKERS_FILE, "wb") as f:
-        pickle.dump(us_tickers, f)
+    # Plain text loads faster than unpickling a set; written aside and renamed so readers never see half a file
+    tmp_file = US_TICKERS_FILE + ".tmp"
+    with open(tmp_file, "w", encoding="utf-8") as f:
+        f.write("\n".join(sorted(us_tickers)))
+    os.replace(tmp_file, US_TICKERS_FILE)
 
     return us_tickers
 
@@ -79,4 +107,11 @@ def is_us_stock(symbol, us_ticker_set):
     """
     Checks if the given symbol exists in the set of US-listed tickers.
     """
-    return symbol.upper() in us_ticker_set
\ No newline at end of file
+    return symbol.upper() in us_ticker_set
+
+def is_us_stock_bulk(symbols, us_ticker_set):
+    """
+    Checks many symbols at once; returns a list of bools in the same order.
+    """
+    # map keeps the upper-casing and membership checks in C instead of a Python-level loop
+    return list(map(us_ticker_set.__contains__, map(str.upper, symbols)))